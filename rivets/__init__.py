@@ -1,6 +1,8 @@
 from environment import Environment
 from manifest import Manifest
+from planner import BuildPlanner
 from version import VERSION
 import caching
+import file_digests
 from paths import path_registry
 from server import Server
\ No newline at end of file
@@ -42,6 +42,7 @@ class Asset(object):
 			self.mtime = int(statinfo.st_mtime)
 			self.length = statinfo.st_size
 			self.digest = environment.get_file_digest(pathname).hexdigest()
+			self.fingerprint_length = environment.fingerprint_length
 			self.relative_pathname = None
 
 	def init_with(self,environment,coder):
@@ -49,19 +50,35 @@ class Asset(object):
 		self.logical_path = coder['logical_path']
 		self.content_type = coder['content_type']
 		self.digest = coder['digest']
+		self.fingerprint_length = environment.fingerprint_length
 		self.pathname = self.expand_root_path(coder['pathname']) if coder.has_key('pathname') else ''
 		self.mtime = coder['mtime']
 		self.length = int(coder['length'])
 
+	@property
+	def source(self):
+		if callable(self._source):
+			self._source = self._source()
+		return self._source
+
+	@source.setter
+	def source(self,value):
+		self._source = value
+
 	@property
 	def dependencies(self):
 		return []
 		
+	@property
+	def fingerprint(self):
+		length = getattr(self,'fingerprint_length',None)
+		return self.digest[:length] if length else self.digest
+
 	@property
 	def digest_path(self):
 
 		def do_replace(matchobj):
-				return "-%s%s" % (self.digest,matchobj.group(0))
+				return "-%s%s" % (self.fingerprint,matchobj.group(0))
 
 		return re.sub(r"""\.(\w+)$""",do_replace,self.logical_path)
 
@@ -132,7 +149,7 @@ class Asset(object):
 			else:
 				f = open("%s+"%filename,'wb')
 
-			f.write(self.to_string())
+			self.write_source(f)
 			f.close()
 			os.utime("%s+"%filename,(self.mtime,self.mtime))
 
@@ -144,6 +161,9 @@ class Asset(object):
 			if os.path.exists("%s+"%filename):
 				os.remove("%s+"%filename)
 
+	def write_source(self,f):
+		f.write(self.to_string())
+
 	@property
 	def dependency_paths(self):
 		return getattr(self,'_dependency_paths',[])
@@ -2,17 +2,16 @@ import regex as re
 import os
 
 from ..extensions import get_extension
-from ..utils import unique_list
+from ..utils import unique_list, memoized_property
 from ..errors import FileOutsidePaths
 
-class AssetAttributes:
+class AssetAttributes(object):
 
 	def __init__(self,environment,path):
 		self.environment = environment
 		self.path = path
-		self._extensions = []
 
-	@property
+	@memoized_property
 	def search_paths(self):
 		paths = [self.path]
 
@@ -28,9 +27,9 @@ class AssetAttributes:
 		if re.sub('|'.join([re.escape(ext) for ext in extensions]),'', os.path.basename(self.path)) != 'index':
 			paths.append(os.path.join(path_without_extensions,"index%s"%''.join(extensions)))
 
-		return paths
+		return tuple(paths)
 
-	@property
+	@memoized_property
 	def logical_path(self):
 		root_path = ''
 
@@ -41,7 +40,6 @@ class AssetAttributes:
 
 		if root_path != "":
 
-			path = re.sub("%s/"%root_path,'',self.path)
 			path = os.path.relpath(self.path,root_path)
 			for ext in self.engine_extensions:
 				path = re.sub(ext,'',path)
@@ -52,11 +50,11 @@ class AssetAttributes:
 		else:
 			raise FileOutsidePaths("%s isn't in paths: %s" % (self.path,', '.join(self.environment.paths)))
 
-	@property
+	@memoized_property
 	def asset_extension(self):
 		return get_extension(self.path)
 
-	@property
+	@memoized_property
 	def content_type(self):
 		format_extension = self.format_extension
 		
@@ -67,7 +65,7 @@ class AssetAttributes:
 
 		return content_type if content_type else 'application/octet-stream'
 
-	@property
+	@memoized_property
 	def engine_extensions(self):
 		exts = self.extensions
 		try:
@@ -75,26 +73,19 @@ class AssetAttributes:
 			exts = exts[offset+1:]
 		except ValueError:
 			exts = exts
-		return [ext for ext in unique_list(exts) if self.environment.engines[ext]]
+		return tuple(ext for ext in unique_list(exts) if self.environment.engines[ext])
 
-	@property
+	@memoized_property
 	def engines(self):
-		engine_extensions = self.engine_extensions
-		engines = []
-		for ext in engine_extensions:
-			engines.append(self.environment.engines[ext])
-		return engines
+		return tuple(self.environment.engines[ext] for ext in self.engine_extensions)
 
-	@property
+	@memoized_property
 	def engine_content_type(self):
-		engines = list(self.engines)
-		engines.reverse()
-
-		for engine in engines:
+		for engine in reversed(self.engines):
 			if getattr(engine,'default_mime_type',None):
 				return engine.default_mime_type
 
-	@property
+	@memoized_property
 	def engine_format_extension(self):
 		content_type = self.engine_content_type
 
@@ -103,39 +94,17 @@ class AssetAttributes:
 
 		return ""
 
-	@property
+	@memoized_property
 	def processors(self):
-		content_type = self.content_type
-
-		processors = []
-
-		preprocessors = list(self.environment.processors.get_preprocessors(content_type))
-		preprocessors.reverse()
-		processors.extend(preprocessors)
-
-		engines = self.engines
-		engines.reverse()
-		processors.extend(engines)
+		return self.environment.processors.get_pipeline(self.content_type,self.engines)
 
-		postprocessors = list(self.environment.processors.get_postprocessors(content_type))
-		postprocessors.reverse()
-		processors.extend(postprocessors)
-
-		return processors
-
-	@property
+	@memoized_property
 	def extensions(self):
-		basename = os.path.basename(self.path)
-		extensions = self._extensions
-		extensions.extend(re.findall(r"""\.[^.]+""",basename))
-		return unique_list(extensions)
+		return tuple(unique_list(re.findall(r"""\.[^.]+""",os.path.basename(self.path))))
 
-	@property
+	@memoized_property
 	def format_extension(self):
-		extensions = list(self.extensions)
-		extensions.reverse()
-
-		for ext in extensions:
+		for ext in reversed(self.extensions):
 			if self.environment.mimetypes[ext] and not self.environment.engines[ext]:
 				return ext
 
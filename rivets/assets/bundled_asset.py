@@ -12,18 +12,23 @@ class BundledAsset(Asset):
 			self._required_assets = self.processed_asset.required_assets if self.processed_asset else []
 			self._dependency_paths = unique_list(self.processed_asset.dependency_paths) if self.processed_asset else []
 
-			self.source = ""
-
-			for dependency in self.to_list():
-				self.source += dependency.to_string()
+			self.segments = self.build_segments(self.to_list())
+			processors = environment.processors.get_bundle_pipeline(self.content_type)
+			self.segmented = not processors
+			digest = environment.digest
 
-			context = environment.context_class(environment,logical_path,pathname)
-			self.source = context.evaluate(pathname,data=self.source, processors=environment.processors.get_bundleprocessors(self.content_type))
+			if processors:
+				context = environment.context_class(environment,logical_path,pathname)
+				self.source = context.evaluate(pathname,data=self.join_segments(), processors=processors)
+				self.length = len(self.source)
+				digest.update(self.source)
+			else:
+				self.source = self.join_segments
+				self.length = sum([segment.length for segment in self.segments])
+				for segment in self.segments:
+					digest.update(segment.digest)
 
 			self.mtime = max(set(self.to_list()) | set(self.dependency_paths),key=lambda x:x.mtime).mtime
-			self.length = len(self.source)
-			digest = environment.digest
-			digest.update(self.source)
 			self.digest = digest.hexdigest()
 
 	def init_with(self,environment,coder):
@@ -35,14 +40,26 @@ class BundledAsset(Asset):
 		if self.processed_asset.dependency_digest != coder['required_assets_digest']:
 			raise UnserializeError('processed asset belongs to a stale environment')
 
-		self.source = coder['source']
+		self.segmented = coder.has_key('segment_sources')
+
+		if self.segmented:
+			self.segments = self.load_segments(coder['segments'],coder['segment_sources'])
+			self.source = self.join_segments
+		else:
+			self.segments = []
+			self.source = coder['source']
 
 	def encode_with(self,coder):
 		coder = super(BundledAsset,self).encode_with(coder)
 
-		coder['source'] = self.source
 		coder['required_assets_digest'] = self.processed_asset.dependency_digest
 
+		if self.segmented:
+			coder['segments'] = [[self.relativize_root_path(segment.pathname),segment.digest,segment.offset,segment.length] for segment in self.segments]
+			coder['segment_sources'] = [segment.source for segment in self.segments]
+		else:
+			coder['source'] = self.source
+
 		return coder
 
 	@property
@@ -60,5 +77,45 @@ class BundledAsset(Asset):
 	def to_list(self):
 		return self.required_assets
 
+	def load_segments(self,records,sources):
+		return [BundleSegment(self.expand_root_path(path),digest,offset,length,source) for (path,digest,offset,length),source in zip(records,sources)]
+
+	def build_segments(self,assets):
+		segments = []
+		offset = 0
+
+		for asset in assets:
+			segment = BundleSegment(asset.pathname,asset.digest,offset,asset.length,asset.to_string)
+			segments.append(segment)
+			offset += segment.length
+
+		return segments
+
+	def join_segments(self):
+		return ''.join([segment.source for segment in self.segments])
+
+	def write_source(self,f):
+		if self.segments and callable(self._source):
+			f.writelines([segment.source for segment in self.segments])
+		else:
+			super(BundledAsset,self).write_source(f)
+
 	def is_fresh(self,environment):
-		return self.processed_asset.is_fresh(environment)
\ No newline at end of file
+		return self.processed_asset.is_fresh(environment)
+
+class BundleSegment(object):
+
+	__slots__ = ('pathname','digest','offset','length','_source')
+
+	def __init__(self,pathname,digest,offset,length,source):
+		self.pathname = pathname
+		self.digest = digest
+		self.offset = offset
+		self.length = length
+		self._source = source
+
+	@property
+	def source(self):
+		if callable(self._source):
+			self._source = self._source()
+		return self._source
\ No newline at end of file
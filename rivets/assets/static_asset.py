@@ -1,12 +1,19 @@
 import os
 
 from asset import Asset
+from ..utils import each_chunk
 
 class StaticAsset(Asset):
+
+	chunk_size = 16384
 	
 	@property
 	def source(self):
-		return open(self.pathname,'r+').read()
+		with open(self.pathname,'rb') as f:
+			return f.read()
+
+	def each_chunk(self,chunk_size=None,start=0,stop=None):
+		return each_chunk(self.pathname,chunk_size or self.chunk_size,start,stop)
 
 	def to_path(self):
 		return self.pathname
@@ -26,15 +33,9 @@ class StaticAsset(Asset):
 
 			if options['compress']:
 				import gzip
-				a = open(self.pathname,'rb')
 				f = gzip.open('%s+'%filename,'wb')
-				buf = ""
-				while True:
-					buf=a.read(16384)
-					if buf:
-						f.write(buf)
-					else:
-						break
+				for buf in self.each_chunk():
+					f.write(buf)
 				f.close()
 				os.utime('%s+'%filename,(self.mtime,self.mtime))
 			else:
@@ -1,15 +1,26 @@
 import os
 import re
+import stat
+import mmap
+import heapq
 from hashlib import md5
 import json
 import copy
 import hashlib
+import functools
 
 from assets import Asset, AssetAttributes, BundledAsset, ProcessedAsset, StaticAsset
-from errors import FileNotFound, CircularDependencyError
+from caching import compact
+from errors import FileNotFound, CircularDependencyError, ArgumentError
+from file_digests import FileDigest, file_digest_cache, get_digest_class
 from paths import Paths
+from planner import BuildPlanner
+from processing import DirectiveProcessor
 from server import Server
-from utils import read_unicode
+from utils import read_unicode, each_chunk, scandir
+
+IGNORED_ENTRY_PATTERN = re.compile(r"""^\.|~$|^\#.*\#$""")
+EXTENSION_PATTERN = re.compile(r"""\.[^.]+""")
 
 class Base(Paths,Server,object):
 
@@ -17,7 +28,12 @@ class Base(Paths,Server,object):
 	_digest = None
 
 	_circular_calls = None
+	persist_file_digests = False
+	use_logical_path_index = False
+	digest_chunk_size = 65536
+	digest_mmap_threshold = None
 	_digest_class = hashlib.md5
+	_fingerprint_length = None
 	_version = None
 
 	@property
@@ -38,6 +54,20 @@ class Base(Paths,Server,object):
 		self.expire_index()
 		self._digest_class = value
 
+	def use_digest(self,name,digest_size=None):
+		self.digest_class = get_digest_class(name,digest_size)
+
+	@property
+	def fingerprint_length(self):
+		return self._fingerprint_length
+
+	@fingerprint_length.setter
+	def fingerprint_length(self,value):
+		if value is not None and not 7 <= value <= 128:
+			raise ArgumentError("fingerprint_length must be between 7 and 128, got %r" % value)
+		self.expire_index()
+		self._fingerprint_length = value
+
 	@property
 	def digest(self):
 
@@ -50,12 +80,50 @@ class Base(Paths,Server,object):
 		return self._digest.copy()
 
 	def get_file_digest(self,path):
+		version = self.digest.hexdigest()
+
+		try:
+			stats = os.stat(path)
+		except OSError:
+			return FileDigest(version,self.digest)
+
+		key = (version,path,stats.st_ino,stats.st_size,stats.st_mtime)
+		digest = file_digest_cache.get(key)
+
+		if digest:
+			return digest.copy()
+
+		if self.persist_file_digests:
+			cache_key = self.expand_cache_key("digest:%s:%s:%d:%d:%r" % key)
+			hexdigest = self.cache_get(cache_key)
+
+			if hexdigest:
+				digest = FileDigest(hexdigest,compute=functools.partial(self.compute_file_digest,path,stats))
+			else:
+				hash_object = self.compute_file_digest(path,stats)
+				digest = FileDigest(hash_object.hexdigest(),hash_object)
+				self.cache_set(cache_key,digest.hexdigest())
+		else:
+			hash_object = self.compute_file_digest(path,stats)
+			digest = FileDigest(hash_object.hexdigest(),hash_object)
+
+		return file_digest_cache.set(key,digest).copy()
+
+	def compute_file_digest(self,path,stats):
 		digest = self.digest
-		if os.path.isfile(path):
-			data = open(path).read()
-			digest.update(data)
-		elif os.path.isdir(path):
-			entries = self.search_path.entries(unicode(path))
+		if stat.S_ISREG(stats.st_mode):
+			if self.digest_mmap_threshold and stats.st_size >= self.digest_mmap_threshold:
+				with open(path,'rb') as f:
+					data = mmap.mmap(f.fileno(),0,access=mmap.ACCESS_READ)
+					try:
+						digest.update(data)
+					finally:
+						data.close()
+			else:
+				for chunk in each_chunk(path,self.digest_chunk_size):
+					digest.update(chunk)
+		elif stat.S_ISDIR(stats.st_mode):
+			entries = self.entries(path.encode('utf8') if isinstance(path,unicode) else path)
 			digest.update(','.join(entries))
 		return digest
 
@@ -156,11 +224,25 @@ class Base(Paths,Server,object):
 		return self.search_path.stat(path)
 
 	def get_attributes_for(self,path):
-		return AssetAttributes(self,path)
+		attributes = self.attributes_cache.get(path)
+
+		if attributes is None:
+			attributes = self.attributes_cache[path] = AssetAttributes(self,path)
+
+		return attributes
 
 	def get_content_type_of(self,path):
 		return self.get_attributes_for(path).content_type
 
+	def get_extension_content_type(self,path):
+		extensions = tuple(EXTENSION_PATTERN.findall(os.path.basename(path)))
+		content_type = self.extension_content_types.get(extensions)
+
+		if content_type is None:
+			content_type = self.extension_content_types[extensions] = self.get_content_type_of(path)
+
+		return content_type
+
 	def __getitem__(self,path):
 		return self.find_asset(path)
 
@@ -204,32 +286,34 @@ class Base(Paths,Server,object):
 
 		if options.has_key('callback') and options['callback']:
 			callback = options.pop('callback')
+			components = options.pop('components',None)
+
 			def process_asset(paths):
 				if paths:
 					for path in paths:
 						if os.path.basename(path)=='component.json':
-							component = json.loads(open(path).read())
-
-							if component.has_key('main'):
-								if isinstance(component['main'],str) or isinstance(component['main'],unicode):
-									return callback(os.path.join(os.path.dirname(path),component['main']))
-								elif isinstance(component['main'],list):
-									filename,ext = os.path.splitext(logical_path)
+							filename,ext = os.path.splitext(logical_path)
 
-									for fn in component['main']:
-										fn_name,fn_ext = os.path.splitext(fn)
-										if ext == "" or ext == fn_ext:
-											asset = callback(os.path.join(os.path.dirname(path),fn))
-											if asset:
-												return asset
+							for main_ext,main in self.component_mains(path):
+								if main_ext is None or ext == "" or ext == main_ext:
+									asset = callback(main)
+									if asset:
+										if components is not None:
+											components.append(path)
+										return asset
 
 						else:
 							asset = callback(path)
 							if asset:
 								return asset
 
-			args = self.get_attributes_for(logical_path).search_paths
-			asset = self.search_path.find(callback=process_asset,*args,**options)
+			candidates = self.logical_path_index.find(logical_path) if self.use_logical_path_index else None
+
+			if candidates:
+				asset = process_asset(candidates)
+			else:
+				args = self.get_attributes_for(logical_path).search_paths
+				asset = self.search_path.find(callback=process_asset,*args,**options)
 			
 		else:
 			options['callback'] = lambda x: x
@@ -238,64 +322,137 @@ class Base(Paths,Server,object):
 			return asset
 		raise FileNotFound("Couldn't find file '%s'" % logical_path)
 
+	def read_component(self,path):
+		stats = os.stat(path)
+		key = (stats.st_mtime,stats.st_size)
+		entry = self.component_cache.get(path)
+
+		if entry is None or entry[0] != key:
+			entry = self.component_cache[path] = (key,json.loads(open(path).read()))
+
+		return entry[1]
+
+	def component_mains(self,path):
+		component = self.read_component(path)
+		dirname = os.path.dirname(path)
+		mains = []
+
+		if component.has_key('main'):
+			if isinstance(component['main'],str) or isinstance(component['main'],unicode):
+				mains.append((None,os.path.join(dirname,component['main'])))
+			elif isinstance(component['main'],list):
+				for fn in component['main']:
+					fn_name,fn_ext = os.path.splitext(fn)
+					mains.append((fn_ext,os.path.join(dirname,fn)))
+
+		return mains
+
+	def get_directive_processor(self,path):
+		for processor in self.get_attributes_for(path).processors:
+			if isinstance(processor,type) and issubclass(processor,DirectiveProcessor):
+				return processor
+
+		return None
+
+	def get_directives(self,path):
+		processor = self.get_directive_processor(path)
+
+		if not processor:
+			return []
+
+		key = self.expand_directives_key(self.get_file_digest(path).hexdigest(),processor)
+		directives = self.cache_get(key)
+
+		if directives is None:
+			data = read_unicode(path,self.default_encoding)
+			directives = processor(path,block=lambda x: data).directives
+			self.cache_set(key,directives)
+
+		return [tuple(directive) for directive in directives]
+
+	def require_closure(self,path):
+		planner = BuildPlanner(self)
+		planner.plan(path)
+
+		return planner.closure(planner.roots[0][1])
+
 	def compile(self,path):
 		
 		asset = self.find_asset(path)
 		return asset.to_string()
 
-	def each_entry(self,root,callback=None):
+	def scan_entries(self,root):
+		if scandir:
+			try:
+				for entry in scandir(root):
+					if not IGNORED_ENTRY_PATTERN.search(entry.name):
+						yield entry.name,entry.is_dir()
+			except OSError:
+				return
+		else:
+			for filename in self.entries(root.encode('utf8')):
+				yield filename,os.path.isdir(os.path.join(root,filename))
 
-		paths = []
-		for filename in sorted(self.entries(root.encode('utf8'))):
-			path = os.path.join(root,filename)
-			paths.append(path)
+	def walk_entries(self,*roots):
+		heap = []
 
-			if os.path.isdir(path):
-				self.each_entry(path,callback= lambda x:paths.append(x))
+		def push(root):
+			for filename,is_dir in self.scan_entries(root):
+				heapq.heappush(heap,(os.path.join(root,filename),is_dir))
 
-		if not callback:
-			return sorted(paths)
+		for root in roots:
+			push(root)
 
-		for path in sorted(paths):
-			callback(path)
+		while heap:
+			path,is_dir = heapq.heappop(heap)
+			yield path,is_dir
 
-	def each_file(self,callback=None):
+			if is_dir:
+				push(path)
 
-		files = []
+	def iter_entries(self,root):
+		for path,is_dir in self.walk_entries(root):
+			yield path
 
-		def do(path):
-			if not os.path.isdir(path):
-				files.append(path)
+	def iter_files(self):
+		for path,is_dir in self.walk_entries(*self.paths):
+			if not is_dir:
+				yield path
 
-		for root in self.paths:
-			self.each_entry(root,callback=do)
+	def iter_logical_paths(self,*filters):
+		filters = list(filters)
+		seen = set()
 
-		if not callback:
-			return sorted(files)
+		for filename in self.iter_files():
+			logical_path = self.logical_path_for_fullname(filename,filters)
+			if logical_path and logical_path not in seen:
+				seen.add(logical_path)
+				yield logical_path,filename
 
-		for filename in sorted(files):
-			callback(filename)
+	def each_entry(self,root,callback=None):
 
-	def each_logical_path(self,*filters,**kwargs):
+		if not callback:
+			return list(self.iter_entries(root))
 
-		callback = kwargs.pop('callback',None)
+		for path in self.iter_entries(root):
+			callback(path)
 
-		files = {}
+	def each_file(self,callback=None):
 
-		filters = list(filters)
+		if not callback:
+			return list(self.iter_files())
 
-		def do(filename):
-			logical_path = self.logical_path_for_fullname(filename,filters)
-			if logical_path:
-				if not files.has_key(logical_path):
-					files[logical_path] = filename
+		for filename in self.iter_files():
+			callback(filename)
 
-		self.each_file(callback=do)
+	def each_logical_path(self,*filters,**kwargs):
+
+		callback = kwargs.pop('callback',None)
 
 		if not callback:
-			return files.keys()
+			return [logical_path for logical_path,filename in self.iter_logical_paths(*filters)]
 
-		for logical_path,filename in files.iteritems():
+		for logical_path,filename in self.iter_logical_paths(*filters):
 			callback(logical_path,filename)
 
 	def circular_call_protection(self,path,callback):
@@ -379,6 +536,11 @@ class Base(Paths,Server,object):
 		if hasattr(self.cache,'set'):
 			return self.cache.set(key,value)
 
+	def cache_delete(self,key):
+
+		if hasattr(self.cache,'delete'):
+			return self.cache.delete(key)
+
 	def cache_asset(self,path,callback=None):
 
 		if self.cache is None:
@@ -410,12 +572,69 @@ class Base(Paths,Server,object):
 
 	def cache_get_hash(self,key):
 		asset_hash = self.cache_get(self.expand_cache_key(key))
+
+		if compact.is_compact(asset_hash):
+			asset_hash = compact.load(asset_hash)
+		elif isinstance(asset_hash,dict):
+			asset_hash = dict(asset_hash)
+
 		if asset_hash and isinstance(asset_hash,dict) and self.digest.hexdigest() == asset_hash['_version']:
+
+			if asset_hash.has_key('source_digest'):
+				source = self.cache_get_body(asset_hash.pop('source_digest'))
+				if source is None:
+					return None
+				asset_hash['source'] = source
+
+			if asset_hash.has_key('segment_source_digests'):
+				sources = [self.cache_get_body(digest) for digest in asset_hash.pop('segment_source_digests')]
+				if None in sources:
+					return None
+				asset_hash['segment_sources'] = sources
+
 			return asset_hash
 
 		return None
 
 	def cache_set_hash(self,key,asset_hash):
+		asset_hash = dict(asset_hash)
 		asset_hash['_version'] = self.digest.hexdigest()
-		self.cache_set(self.expand_cache_key(key),asset_hash)
-		return asset_hash
\ No newline at end of file
+
+		if asset_hash.has_key('source'):
+			asset_hash['source_digest'] = self.cache_set_body(asset_hash.pop('source'))
+
+		if asset_hash.has_key('segment_sources'):
+			asset_hash['segment_source_digests'] = [self.cache_set_body(source) for source in asset_hash.pop('segment_sources')]
+
+		self.cache_set(self.expand_cache_key(key),compact.dump(asset_hash))
+		return asset_hash
+
+	def expand_body_key(self,digest):
+		return os.path.join('rivets','bodies',digest)
+
+	def expand_directives_key(self,digest,processor):
+		return os.path.join('rivets','directives','%s-%s' % (digest,processor.__name__))
+
+	def cache_get_body(self,digest):
+		blob = self.cache_get(self.expand_body_key(digest))
+
+		if compact.is_compact(blob):
+			blob = compact.load(blob)
+
+		if isinstance(blob,dict):
+			return blob['source']
+
+		return None
+
+	def cache_set_body(self,source):
+		if isinstance(source,unicode):
+			digest = md5('u' + source.encode('utf8')).hexdigest()
+		else:
+			digest = md5('b' + source).hexdigest()
+
+		key = self.expand_body_key(digest)
+
+		if self.cache_get(key) is None:
+			self.cache_set(key,compact.dump({'source':source}))
+
+		return digest
\ No newline at end of file
@@ -1 +1,4 @@
-from file_store import FileStore
\ No newline at end of file
+import compact
+from file_store import FileStore
+from memory_store import MemoryStore
+from multi_store import MultiStore
\ No newline at end of file
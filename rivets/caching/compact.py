@@ -0,0 +1,87 @@
+import marshal
+import struct
+
+MAGIC = 'RVTC'
+VERSION = 1
+PREAMBLE = struct.Struct('>4sBII')
+
+class LazyBody(object):
+
+	def __init__(self,data,start,length,is_unicode=False):
+		self.data = data
+		self.start = start
+		self.length = length
+		self.is_unicode = is_unicode
+
+	def __len__(self):
+		return self.length
+
+	def __call__(self):
+		body = self.read()
+		return body.decode('utf8') if self.is_unicode else body
+
+	def read(self):
+		return self.data[self.start:self.start + self.length]
+
+class FileBody(LazyBody):
+
+	def __init__(self,path,start,length,is_unicode=False):
+		super(FileBody,self).__init__(path,start,length,is_unicode)
+		self.body = None
+
+	def __call__(self):
+		if self.body is None:
+			self.body = super(FileBody,self).__call__()
+		return self.body
+
+	def read(self):
+		with open(self.data,'rb') as f:
+			f.seek(self.start)
+			return f.read(self.length)
+
+def is_compact(data):
+	return isinstance(data,str) and len(data) >= PREAMBLE.size and data[:len(MAGIC)] == MAGIC
+
+def dump(asset_hash):
+	header = dict(asset_hash)
+	body = header.pop('source',None)
+
+	is_unicode = isinstance(body,unicode)
+	if is_unicode:
+		body = body.encode('utf8')
+
+	header['_body'] = (body is not None,is_unicode)
+
+	header_data = marshal.dumps(header,2)
+	body = body or ''
+
+	return PREAMBLE.pack(MAGIC,VERSION,len(header_data),len(body)) + header_data + body
+
+def load(data):
+	magic,version,header_length,body_length = PREAMBLE.unpack(data[:PREAMBLE.size])
+
+	if magic != MAGIC or version != VERSION:
+		return None
+
+	offset = PREAMBLE.size
+	header = marshal.loads(data[offset:offset + header_length])
+
+	has_body,is_unicode = header.pop('_body')
+	if has_body:
+		header['source'] = LazyBody(data,offset + header_length,body_length,is_unicode)
+
+	return header
+
+def load_file(f,path,preamble):
+	magic,version,header_length,body_length = PREAMBLE.unpack(preamble)
+
+	if magic != MAGIC or version != VERSION:
+		return None
+
+	header = marshal.loads(f.read(header_length))
+
+	has_body,is_unicode = header.pop('_body')
+	if has_body:
+		header['source'] = FileBody(path,PREAMBLE.size + header_length,body_length,is_unicode)
+
+	return header
@@ -1,22 +1,120 @@
 import os
 import pickle
+import tempfile
+
+try:
+	from collections import OrderedDict
+except ImportError:
+	from ordereddict import OrderedDict
+
+import compact
 
 class FileStore:
 
-	def __init__(self,root):
+	def __init__(self,root,max_size=None):
 		self.root = os.path.abspath(root)
+		self.max_size = max_size
+		self.size = None
+		self.index = None
+
+	def path_for(self,key):
+		dirname,name = os.path.split(key)
+		return os.path.join(self.root,dirname,name[:2],name)
 
 	def get(self,key):
-		pathname = os.path.join(self.root,key)
-		return pickle.load(open(pathname,'rb')) if os.path.exists(pathname) else None
+		pathname = self.path_for(key)
+
+		try:
+			with open(pathname,'rb') as f:
+				preamble = f.read(compact.PREAMBLE.size)
+
+				if compact.is_compact(preamble):
+					value = compact.load_file(f,pathname,preamble)
+				else:
+					value = pickle.loads(preamble + f.read())
+		except (IOError,OSError,EOFError,ValueError,pickle.UnpicklingError):
+			return None
+
+		if self.max_size:
+			index = self.load_index()
+			if index.has_key(pathname):
+				index[pathname] = index.pop(pathname)
+
+		return value
 
 	def set(self,key,value):
-		path = os.path.join(self.root,key)
+		path = self.path_for(key)
 		dirname = os.path.dirname(path)
 
 		if not os.path.exists(dirname):
 			os.makedirs(dirname)
 
-		f = open(path,'w')
-		pickle.dump(value,f)
-		return value
\ No newline at end of file
+		fd,tmp = tempfile.mkstemp(dir=dirname)
+		try:
+			with os.fdopen(fd,'wb') as f:
+				if compact.is_compact(value):
+					f.write(value)
+				else:
+					pickle.dump(value,f,pickle.HIGHEST_PROTOCOL)
+
+			os.rename(tmp,path)
+		finally:
+			if os.path.exists(tmp):
+				os.remove(tmp)
+
+		if self.max_size:
+			index = self.load_index()
+			self.size -= index.pop(path,0)
+			index[path] = os.path.getsize(path)
+			self.size += index[path]
+
+			if self.size > self.max_size:
+				self.prune()
+
+		return value
+
+	def delete(self,key):
+		path = self.path_for(key)
+
+		if os.path.exists(path):
+			os.remove(path)
+
+		if self.index is not None:
+			self.size -= self.index.pop(path,0)
+
+	def load_index(self):
+		if self.index is None:
+			self.index = OrderedDict()
+			for path,mtime,size in sorted(self.entries(),key=lambda entry: entry[1]):
+				self.index[path] = size
+			self.size = sum(self.index.values())
+
+		return self.index
+
+	def current_size(self):
+		self.load_index()
+		return self.size
+
+	def entries(self):
+		entries = []
+		for dirpath,dirnames,filenames in os.walk(self.root):
+			for filename in filenames:
+				path = os.path.join(dirpath,filename)
+				try:
+					stat = os.stat(path)
+				except OSError:
+					continue
+				entries.append((path,stat.st_mtime,stat.st_size))
+		return entries
+
+	def prune(self,target=None):
+		target = target if target is not None else int(self.max_size * 0.75)
+		index = self.load_index()
+
+		while index and self.size > target:
+			path,size = index.popitem(last=False)
+			self.size -= size
+			try:
+				os.remove(path)
+			except OSError:
+				pass
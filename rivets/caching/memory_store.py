@@ -0,0 +1,63 @@
+import threading
+
+try:
+	from collections import OrderedDict
+except ImportError:
+	from ordereddict import OrderedDict
+
+import compact
+
+def sizeof(value):
+	if isinstance(value,basestring):
+		return len(value)
+	elif isinstance(value,compact.LazyBody):
+		return len(value)
+	elif isinstance(value,dict):
+		return sum([sizeof(k) + sizeof(v) for k,v in value.iteritems()])
+	elif isinstance(value,(list,tuple,set)):
+		return sum([sizeof(v) for v in value])
+	return 8
+
+class MemoryStore:
+
+	def __init__(self,max_size=32*1024*1024):
+		self.max_size = max_size
+		self.size = 0
+		self.entries = OrderedDict()
+		self.lock = threading.Lock()
+
+	def get(self,key):
+		with self.lock:
+			entry = self.entries.pop(key,None)
+			if entry is None:
+				return None
+
+			self.entries[key] = entry
+			return entry[0]
+
+	def set(self,key,value):
+		size = sizeof(value)
+
+		with self.lock:
+			old = self.entries.pop(key,None)
+			if old:
+				self.size -= old[1]
+
+			if size <= self.max_size:
+				self.entries[key] = (value,size)
+				self.size += size
+
+			while self.size > self.max_size:
+				evicted_key,evicted = self.entries.popitem(last=False)
+				self.size -= evicted[1]
+
+		return value
+
+	def delete(self,key):
+		with self.lock:
+			entry = self.entries.pop(key,None)
+			if entry:
+				self.size -= entry[1]
+
+	def __len__(self):
+		return len(self.entries)
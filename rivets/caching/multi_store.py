@@ -0,0 +1,24 @@
+class MultiStore:
+
+	def __init__(self,*stores):
+		self.stores = list(stores)
+
+	def get(self,key):
+		for index,store in enumerate(self.stores):
+			value = store.get(key)
+			if value is not None:
+				for upper in self.stores[:index]:
+					upper.set(key,value)
+				return value
+
+		return None
+
+	def set(self,key,value):
+		for store in self.stores:
+			store.set(key,value)
+		return value
+
+	def delete(self,key):
+		for store in self.stores:
+			if hasattr(store,'delete'):
+				store.delete(key)
@@ -2,6 +2,7 @@ import os
 import regex as re
 
 from errors import ContentTypeMismatch,FileNotFound
+from processing import ProcessorPipeline
 import utils
 import base64
 
@@ -51,15 +52,10 @@ class Context(object):
 			else:
 				result = utils.read_unicode(pathname)
 
-		for processor in processors:
-			try:
-				template = processor(pathname,block=lambda x: result)
-				result = template.render(self,{})
+		if not isinstance(processors,ProcessorPipeline):
+			processors = ProcessorPipeline(processors)
 
-			except Exception,e:
-				self.annotate_exception(e)
-
-		return result
+		return processors.render(self,pathname,result)
 
 	def resolve(self,path,**options):
 		attributes = self.environment.get_attributes_for(path)
@@ -88,8 +84,15 @@ class Context(object):
 			raise FileNotFound("Couldn't find file '%s'" % path)
 
 		else:
+			components = []
 			options['base_path'] = os.path.realpath(os.path.dirname(self.pathname))
-			return self.environment.resolve(path,**options)
+			options['components'] = components
+			pathname = self.environment.resolve(path,**options)
+
+			for component in components:
+				self.depend_on(component)
+
+			return pathname
 
 	def depend_on(self,path):
 		self.dependency_paths.append(self.resolve(path))
@@ -105,6 +108,13 @@ class Context(object):
 			self.depend_on_asset(pathname)
 			self.required_paths.append(pathname)
 
+	def depend_on_paths(self,paths):
+		self.dependency_paths.extend(paths)
+
+	def require_assets(self,pathnames):
+		self.dependency_assets.extend(pathnames)
+		self.required_paths.extend(pathnames)
+
 	def stub_asset(self,path):
 		self.stubbed_assets.append(self.resolve(path,content_type ='self'))
 
@@ -0,0 +1,87 @@
+import os
+import regex as re
+
+class DependencyIndex(object):
+
+	def __init__(self,environment,data=None):
+		self.environment = environment
+		self.version = environment.digest.hexdigest()
+		self.sources = {}
+		self.logical_paths = {}
+
+		if isinstance(data,dict) and data.get('version') == self.version:
+			self.sources = data['sources']
+
+		for path,attrs in self.sources.iteritems():
+			for logical_path in attrs['logical_paths']:
+				self.logical_paths.setdefault(logical_path,set()).add(path)
+
+	def to_hash(self):
+		return {
+			'version':self.version,
+			'sources':self.sources
+		}
+
+	def record(self,logical_path,sources):
+		self.forget(logical_path)
+
+		for pathname,mtime,size,digest in sources:
+			path = self.relativize_root_path(pathname)
+
+			attrs = self.sources.setdefault(path,{'logical_paths':[]})
+			attrs['mtime'] = int(mtime)
+			attrs['size'] = size
+			attrs['digest'] = digest
+
+			if logical_path not in attrs['logical_paths']:
+				attrs['logical_paths'].append(logical_path)
+
+			self.logical_paths.setdefault(logical_path,set()).add(path)
+
+	def forget(self,logical_path):
+		for path in self.logical_paths.pop(logical_path,set()):
+			attrs = self.sources.get(path)
+
+			if attrs and logical_path in attrs['logical_paths']:
+				attrs['logical_paths'].remove(logical_path)
+
+				if not attrs['logical_paths']:
+					del self.sources[path]
+
+	def has_logical_path(self,logical_path):
+		return self.logical_paths.has_key(logical_path)
+
+	def dependents_of(self,pathname):
+		attrs = self.sources.get(self.relativize_root_path(pathname))
+		return list(attrs['logical_paths']) if attrs else []
+
+	def is_changed(self,path):
+		attrs = self.sources[path]
+		pathname = self.expand_root_path(path)
+
+		if not os.path.exists(pathname):
+			return True
+
+		stat = os.stat(pathname)
+
+		if int(stat.st_mtime) == attrs['mtime'] and stat.st_size == attrs['size']:
+			return False
+
+		return self.environment.get_file_digest(pathname).hexdigest() != attrs['digest']
+
+	def changed_sources(self):
+		return [self.expand_root_path(path) for path in sorted(self.sources.iterkeys()) if self.is_changed(path)]
+
+	def stale_logical_paths(self):
+		stale = set()
+
+		for path in self.changed_sources():
+			stale.update(self.dependents_of(path))
+
+		return stale
+
+	def expand_root_path(self,path):
+		return re.sub(r"""^\$root""",self.environment.root,path)
+
+	def relativize_root_path(self,path):
+		return re.sub(r"""^%s"""%re.escape(self.environment.root),'$root',path)
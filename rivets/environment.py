@@ -4,7 +4,9 @@ from crawl import Crawl
 
 from base import Base
 from context import Context
+from errors import FileOutsidePaths
 from index import Index
+from logical_path_index import LogicalPathIndex
 from mime import mimetype_registry
 from engines import engine_registry
 from processing import processor_registry
@@ -17,6 +19,10 @@ class Environment(Base):
 		self.search_path = Crawl(root)
 		self.version = ''
 		self.cache = None
+		self.watcher = None
+		self.generation = 0
+		self._logical_path_index = None
+		self.component_cache = {}
 
 		self.engines = copy.deepcopy(engine_registry)
 		self.mimetypes = copy.deepcopy(mimetype_registry)
@@ -40,6 +46,12 @@ class Environment(Base):
 	def index(self):
 		return Index(self)
 
+	@property
+	def logical_path_index(self):
+		if self._logical_path_index is None:
+			self._logical_path_index = LogicalPathIndex(self.index)
+		return self._logical_path_index
+
 	def find_asset(self,path,**options):
 
 		if not options:
@@ -49,8 +61,8 @@ class Environment(Base):
 			options['bundle'] = True
 
 		key = self.cache_key_for(path,**options)
-		asset = self.assets[key] if self.assets.has_key(key) else None
-		if asset and asset.is_fresh(self):
+		asset = self.assets.get(key)
+		if asset and (self.watcher or asset.is_fresh(self)):
 			return asset
 		else:
 			asset = self.index.find_asset(path,**options)
@@ -61,4 +73,47 @@ class Environment(Base):
 
 	def expire_index(self):
 		self._digest = None
-		self.assets = {}
\ No newline at end of file
+		self.assets = {}
+		self.attributes_cache = {}
+		self.extension_content_types = {}
+		self._logical_path_index = None
+
+	def watch(self,interval=1.0):
+		from watcher import get_watcher
+
+		if not self.watcher:
+			self.watcher = get_watcher(self.paths,self.invalidate,interval)
+			self.watcher.start()
+
+		return self.watcher
+
+	def unwatch(self):
+		if self.watcher:
+			self.watcher.stop()
+			self.watcher = None
+
+	def invalidate(self,pathnames):
+		pathnames = set(pathnames)
+		self.generation += 1
+
+		if self._logical_path_index and self._logical_path_index.is_stale(pathnames):
+			self._logical_path_index = None
+
+		logical_paths = set()
+		for pathname in pathnames:
+			try:
+				logical_paths.add(self.get_attributes_for(pathname).logical_path)
+			except FileOutsidePaths:
+				pass
+
+		for key,asset in self.assets.items():
+			sources = set([asset.pathname] + [dep.pathname for dep in asset.dependency_paths])
+
+			if sources & pathnames or asset.logical_path in logical_paths:
+				self.assets.pop(key,None)
+				pathnames.add(asset.pathname)
+
+		for pathname in pathnames:
+			self.cache_delete(self.expand_cache_key(pathname))
+			self.cache_delete(self.expand_cache_key(self.cache_key_for(pathname,bundle=False)))
+			self.cache_delete(self.expand_cache_key(self.cache_key_for(pathname,bundle=True)))
\ No newline at end of file
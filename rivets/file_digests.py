@@ -0,0 +1,77 @@
+import binascii
+import functools
+import hashlib
+import threading
+
+from errors import ArgumentError
+
+DIGEST_ALGORITHMS = ('md5','sha1','sha256','blake2b')
+
+def get_digest_class(name,digest_size=None):
+	if name not in DIGEST_ALGORITHMS:
+		raise ArgumentError("Unsupported digest algorithm '%s'" % name)
+
+	if name == 'blake2b':
+		if hasattr(hashlib,'blake2b'):
+			blake2b = hashlib.blake2b
+		else:
+			from pyblake2 import blake2b
+
+		return functools.partial(blake2b,digest_size=digest_size) if digest_size else blake2b
+
+	if digest_size:
+		raise ArgumentError("digest_size is only supported by blake2b")
+
+	return getattr(hashlib,name)
+
+class FileDigest(object):
+
+	def __init__(self,hexdigest,hash_object=None,compute=None):
+		self._hexdigest = hexdigest
+		self._hash_object = hash_object
+		self._compute = compute
+
+	def hexdigest(self):
+		if self._hexdigest is None:
+			self._hexdigest = self.hash_object().hexdigest()
+		return self._hexdigest
+
+	def digest(self):
+		return binascii.unhexlify(self.hexdigest())
+
+	def hash_object(self):
+		if self._hash_object is None:
+			self._hash_object = self._compute()
+		return self._hash_object
+
+	def copy(self):
+		hash_object = self._hash_object.copy() if self._hash_object is not None else None
+		return FileDigest(self._hexdigest,hash_object,self._compute)
+
+	def update(self,data):
+		self.hash_object().update(data)
+		self._hexdigest = None
+		self._compute = None
+
+class FileDigestCache(object):
+
+	def __init__(self,max_entries=65536):
+		self.max_entries = max_entries
+		self.digests = {}
+		self.lock = threading.Lock()
+
+	def get(self,key):
+		return self.digests.get(key)
+
+	def set(self,key,digest):
+		with self.lock:
+			if len(self.digests) >= self.max_entries:
+				self.digests.clear()
+			self.digests[key] = digest
+		return digest
+
+	def clear(self):
+		with self.lock:
+			self.digests.clear()
+
+file_digest_cache = FileDigestCache()
@@ -5,25 +5,41 @@ class Index(Base):
 
 	def __init__(self,environment):
 		self.environment = environment
+		self.generation = getattr(environment,'generation',None)
 
 		self.default_encoding = environment.default_encoding
 
 		self.context_class = environment.context_class
 		self.cache = environment.cache
+		self.component_cache = environment.component_cache
+		self.persist_file_digests = environment.persist_file_digests
+		self.use_logical_path_index = environment.use_logical_path_index
+		self.digest_chunk_size = environment.digest_chunk_size
+		self.digest_mmap_threshold = environment.digest_mmap_threshold
 		self.search_path = environment.search_path.index()
 		self._digest = environment.digest
 		self._version = environment.version
+		self._fingerprint_length = environment.fingerprint_length
 		self.mimetypes = copy.deepcopy(environment.mimetypes)
 		self.engines = copy.deepcopy(environment.engines)
 		self.processors = copy.deepcopy(environment.processors)
+		self.processors.pipelines = environment.processors.pipelines
 
 		self.assets = {}
 		self.digests = {}
+		self.directives = {}
+		self.processed_hits = 0
+		self.attributes_cache = environment.attributes_cache
+		self.extension_content_types = environment.extension_content_types
 
 	@property
 	def index(self):
 		return self
 
+	@property
+	def logical_path_index(self):
+		return self.environment.logical_path_index
+
 	def get_file_digest(self,path):
 		
 		if not self.digests.has_key(path):
@@ -32,6 +48,17 @@ class Index(Base):
 
 		return self.digests[path]
 
+	def get_attributes_for(self,path):
+		return self.environment.get_attributes_for(path)
+
+	def get_directives(self,path):
+
+		if not self.directives.has_key(path):
+
+			self.directives[path] = super(Index,self).get_directives(path)
+
+		return self.directives[path]
+
 	def find_asset(self,path,**options):
 
 		if not options.has_key('bundle'):
@@ -41,6 +68,8 @@ class Index(Base):
 		asset = self.assets[key] if self.assets.has_key(key) else None
 
 		if asset:
+			if not options['bundle']:
+				self.processed_hits += 1
 			return asset
 		else:
 
@@ -53,7 +82,8 @@ class Index(Base):
 
 				self.assets[logical_path_cache_key] = self.assets[full_path_cache_key] = asset
 
-				self.environment.assets[logical_path_cache_key] = self.environment.assets[full_path_cache_key] = asset
+				if getattr(self.environment,'generation',None) == self.generation:
+					self.environment.assets[logical_path_cache_key] = self.environment.assets[full_path_cache_key] = asset
 
 			return asset
 
@@ -0,0 +1,87 @@
+import os
+
+from base import IGNORED_ENTRY_PATTERN
+from utils import unique_list
+
+class LogicalPathIndex(object):
+
+	def __init__(self,environment):
+		self.environment = environment
+		self.search_path = environment.search_path.index()
+		self.paths = list(self.search_path.paths)
+		self.extensions = list(self.search_path.extensions)
+		self.aliases = dict(self.search_path.aliases)
+
+		self.matches = {}
+		self.pathnames = set()
+
+		for root in self.paths:
+			for path,is_dir in environment.walk_entries(root):
+				if not is_dir:
+					self.add(root,path)
+
+		for key,names in self.matches.iteritems():
+			self.matches[key] = self.search_path.sort_matches(names,key[2])
+
+	def add(self,root,pathname):
+		self.pathnames.add(pathname)
+		dirname,name = os.path.split(os.path.relpath(pathname,root))
+
+		for basename in self.basenames_for(name):
+			self.matches.setdefault((root,dirname,basename),[]).append(name)
+
+	def basenames_for(self,name):
+		ends = set([len(name)])
+
+		for index in reversed(xrange(len(name))):
+			for ext in self.extensions:
+				if index + len(ext) in ends and name.startswith(ext,index):
+					ends.add(index)
+					break
+
+		basenames = []
+
+		for end in sorted(ends,reverse=True):
+			prefix = name[:end]
+			if not prefix:
+				continue
+
+			basenames.append(prefix)
+
+			for alias,original in self.aliases.iteritems():
+				if prefix.endswith(alias):
+					basename = prefix[:-len(alias)] + original
+					if os.path.splitext(basename)[1] == original:
+						basenames.append(basename)
+
+		return unique_list(basenames)
+
+	def find(self,logical_path):
+		if os.path.isabs(logical_path) or self.search_path.is_relative_path(logical_path):
+			return None
+
+		results = []
+
+		for path in self.environment.get_attributes_for(logical_path).search_paths:
+			dirname,basename = os.path.split(path)
+
+			if not basename:
+				return None
+
+			if dirname and (os.path.normpath(dirname) != dirname or [part for part in dirname.split('/') if IGNORED_ENTRY_PATTERN.search(part)]):
+				return None
+
+			for root in self.paths:
+				for name in self.matches.get((root,dirname,basename),[]):
+					pathname = os.path.abspath(os.path.join(root,dirname,name))
+					if os.path.isfile(pathname):
+						results.append(pathname)
+
+		return results
+
+	def is_stale(self,pathnames):
+		for pathname in pathnames:
+			if pathname not in self.pathnames or not os.path.isfile(pathname):
+				return True
+
+		return False
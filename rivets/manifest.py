@@ -5,7 +5,13 @@ import datetime
 import regex as re
 
 from base import Base
-from assets import BundledAsset
+from assets import BundledAsset, StaticAsset
+from dependency_index import DependencyIndex
+
+_worker_manifest = None
+
+def _build_in_worker(path):
+	return _worker_manifest.build_asset(path)
 
 class Manifest(object):
 
@@ -46,43 +52,101 @@ class Manifest(object):
 	def files(self):
 		return self.data['files'] if self.data.has_key('files') else {}
 
+	def dependencies(self):
+		return DependencyIndex(self.environment,self.data.get('dependencies'))
 
-	def compile(self,*args):
+
+	def compile(self,*args,**kwargs):
 
 		if not self.environment:
 			raise Exception('Manifest requires environment for compilation')
 
-		paths = list(self.environment.each_logical_path(*args)) + [path for path in args if os.path.isabs(path)]
-
-		def build_manifest(path):
-			asset = self.find_asset(path)
-			files = self.files()
-			assets = self.assets()
-			if asset:
-				files[asset.digest_path] = {
-					'logical_path':asset.logical_path,
-					'mtime': asset.mtime,
-					'size': asset.length,
-					'digest':asset.digest
-				}
-
-				assets[asset.logical_path] = asset.digest_path
-
-				target = os.path.join(self.dir,asset.digest_path)
-
-				if os.path.exists(target):
-					print "Skipping %s, already exists" % target
-				else:
-					print "Writing %s" % target
-					asset.write_to(target)
-					if isinstance(asset,BundledAsset):
-						asset.write_to("%s.gz"%target)
-
-			self.save()
-			return asset
-
-		for path in paths:
-			build_manifest(path)
+		workers = kwargs.pop('workers',None)
+		incremental = kwargs.pop('incremental',False)
+
+		paths = [logical_path for logical_path,filename in self.environment.iter_logical_paths(*args)] + [path for path in args if os.path.isabs(path)]
+
+		dependencies = self.dependencies()
+
+		if incremental:
+			stale = dependencies.stale_logical_paths()
+			paths = [path for path in paths if not self.is_up_to_date(path,dependencies,stale)]
+
+		if workers and workers > 1:
+			entries = self.parallel_build(paths,workers)
+		else:
+			entries = [self.build_asset(path) for path in paths]
+
+		files = self.files()
+		assets = self.assets()
+
+		for entry in entries:
+			if entry:
+				digest_path,attrs,sources = entry
+				files[digest_path] = attrs
+				assets[attrs['logical_path']] = digest_path
+				dependencies.record(attrs['logical_path'],sources)
+
+		self.data['files'] = files
+		self.data['assets'] = assets
+		self.data['dependencies'] = dependencies.to_hash()
+
+		self.save()
+
+	def build_asset(self,path):
+		asset = self.find_asset(path)
+
+		if not asset:
+			return None
+
+		target = os.path.join(self.dir,asset.digest_path)
+
+		if os.path.exists(target):
+			print "Skipping %s, already exists" % target
+		else:
+			print "Writing %s" % target
+			asset.write_to(target)
+			if isinstance(asset,BundledAsset):
+				asset.write_to("%s.gz"%target)
+
+		return (asset.digest_path,{
+				'logical_path':asset.logical_path,
+				'mtime': asset.mtime,
+				'size': asset.length,
+				'digest':asset.digest
+			},self.asset_sources(asset))
+
+	def asset_sources(self,asset):
+		if isinstance(asset,StaticAsset):
+			return [(asset.pathname,asset.mtime,asset.length,asset.digest)]
+
+		sources = []
+		for dep in asset.dependency_paths:
+			sources.append((dep.pathname,dep.mtime,os.stat(dep.pathname).st_size,dep.digest))
+
+		return sources
+
+	def is_up_to_date(self,path,dependencies,stale):
+		assets = self.assets()
+
+		if path in stale or not assets.has_key(path) or not dependencies.has_logical_path(path):
+			return False
+
+		return os.path.exists(os.path.join(self.dir,assets[path]))
+
+	def parallel_build(self,paths,workers):
+		global _worker_manifest
+
+		import multiprocessing
+
+		_worker_manifest = self
+		pool = multiprocessing.Pool(workers)
+		try:
+			return pool.map(_build_in_worker,paths,1)
+		finally:
+			pool.close()
+			pool.join()
+			_worker_manifest = None
 
 	def remove(self,filename):
 		path = os.path.join(self.dir,filename)
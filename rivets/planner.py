@@ -0,0 +1,139 @@
+import os
+
+from errors import CircularDependencyError
+from utils import unique_list
+
+class BuildPlanner(object):
+
+	def __init__(self,environment):
+		self.environment = environment
+		self.index = environment.index
+
+		self.graph = {}
+		self.stubs = {}
+		self.closures = {}
+		self.roots = []
+		self.order = []
+
+		self.stats = {
+			'processed':0,
+			'bundled':0,
+			'redundant_runs_avoided':0
+		}
+
+	def plan(self,*paths):
+
+		for path in paths:
+			pathname = path if os.path.isabs(path) else self.index.resolve(path)
+			if (path,pathname) not in self.roots:
+				self.roots.append((path,pathname))
+
+		pending = [pathname for path,pathname in self.roots]
+
+		while pending:
+			pathname = pending.pop()
+
+			if self.graph.has_key(pathname):
+				continue
+
+			requires,stubs = self.scan(pathname)
+			self.graph[pathname] = requires
+			self.stubs[pathname] = stubs
+
+			pending.extend([dep for dep in unique_list(requires + stubs) if not self.graph.has_key(dep)])
+
+		self.order = self.sort()
+
+		return self.order
+
+	def build(self,*paths):
+
+		self.plan(*paths)
+
+		for pathname in self.order:
+			self.index.find_asset(pathname,bundle=False)
+			self.stats['processed'] += 1
+
+		assets = {}
+		hits = self.index.processed_hits
+		for path,pathname in self.roots:
+			assets[path] = self.index.find_asset(path)
+			self.stats['bundled'] += 1
+
+		self.stats['redundant_runs_avoided'] += self.index.processed_hits - hits
+
+		return assets
+
+	def closure(self,pathname):
+		if not self.closures.has_key(pathname):
+			paths = []
+			for dep in self.graph[pathname]:
+				paths.extend(self.closure(dep))
+			paths.append(pathname)
+
+			stubbed = set()
+			for stub in self.stubs[pathname]:
+				stubbed.update(self.closure(stub))
+
+			self.closures[pathname] = [path for path in unique_list(paths) if path not in stubbed]
+
+		return self.closures[pathname]
+
+	def scan(self,pathname):
+		klass = self.index.get_directive_processor(pathname)
+
+		if not klass:
+			return [],[]
+
+		directives = self.index.get_directives(pathname)
+
+		context = self.index.context_class(self.index,self.index.get_attributes_for(pathname).logical_path,pathname)
+		processor = klass(pathname,block=lambda x: '')
+		processor.context = context
+
+		for directive in directives:
+			context.line = directive[0]
+			if directive[1] == 'require_self':
+				context.require_asset(pathname)
+			else:
+				getattr(processor,'process_%s_directive'%directive[1])(*directive[2:])
+			context.line = None
+
+		requires = unique_list(context.required_paths + processor.included_pathnames)
+
+		return [path for path in requires if path != pathname],unique_list(context.stubbed_assets)
+
+	def edges(self,pathname):
+		return unique_list(self.graph[pathname] + self.stubs[pathname])
+
+	def sort(self):
+		order = []
+		visited = set()
+
+		for path,root in self.roots:
+			if root in visited:
+				continue
+
+			visiting = [root]
+			stack = [(root,iter(self.edges(root)))]
+
+			while stack:
+				node,deps = stack[-1]
+
+				for dep in deps:
+					if dep in visiting:
+						cycle = visiting[visiting.index(dep):] + [dep]
+						raise CircularDependencyError("%s has already been required (%s)" % (dep,' -> '.join(cycle)))
+
+					if dep not in visited:
+						visiting.append(dep)
+						stack.append((dep,iter(self.edges(dep))))
+						break
+				else:
+					stack.pop()
+					visiting.pop()
+					visited.add(node)
+					order.append(node)
+
+		return order
+
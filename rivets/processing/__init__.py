@@ -1,4 +1,5 @@
 from registry import ProcessorRegistry
+from pipeline import ProcessorPipeline
 
 from directive_processor import DirectiveProcessor
 from safety_colons import SafetyColons
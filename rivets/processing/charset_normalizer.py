@@ -4,25 +4,30 @@ from lean.template import Template
 
 class CharsetNormalizer(Template):
 
+	stateless = True
+
 	def prepare(self):
 		pass
 
 	def evaluate(self,context,locals,callback=None):
+		return self.call(context,self.data)
+
+	def call(self,context,data):
 		charset = None
 
 		charset_pattern = re.compile(r"""^@charset "([^"]+)";$""",re.M)
-		charsets = charset_pattern.findall(self.data)
+		charsets = charset_pattern.findall(data)
 
 		for match in charsets:
 			if not charset:
 				charset = match
 
-		filtered_data = charset_pattern.sub("",self.data)
+		filtered_data = charset_pattern.sub("",data)
 
 		if charset:
 			return '@charset "%s";%s' % (charset,filtered_data)
 		else:
-			return self.data
+			return data
 
 
 
@@ -1,5 +1,12 @@
 import os
 import regex as re
+import threading
+from hashlib import md5
+
+try:
+	from collections import OrderedDict
+except ImportError:
+	from ordereddict import OrderedDict
 
 from lean.template import Template
 
@@ -7,30 +14,68 @@ from ..errors import ArgumentError
 
 class DirectiveProcessor(Template):
 
-	HEADER_PATTERN = re.compile(r"""\A (
-									(?m:\s*)(
-											(/\* (?m:.*?) \*/) |
-											(\#\#\# (?m:.*?) \#\#\#) |
-											(// [^\n\r]*)+ |
-											(\# [^\n\r]*)+
-										)	
-									)+
-									""",re.X|re.S|re.V1)
-
 	DIRECTIVE_PATTERN = re.compile(r"""
 										^ [\W]* = \s* (\w+.*?) (?:\*/)? $
 									""",re.X)
 
-	def prepare(self):
-		matches = self.HEADER_PATTERN.match(self.data)
-		self.header = matches.group(0) if matches else ''
-		self.body = re.sub(re.escape(self.header) + "\n?",'',self.data,1)
-		
-		if self.body != "" and not re.search(r"""\n\Z""",self.body,re.M):
-			self.body += '\n'
+	scan_cache = OrderedDict()
+	scan_cache_size = 4096
+	scan_cache_lock = threading.Lock()
 
+	def prepare(self):
+		self.header,self.body,self._directives,self._processed_header = self.scan(self.data)
 		self.included_pathnames = []
 
+	def scan(self,data):
+		key = (self.__class__,md5(data.encode('utf8') if isinstance(data,unicode) else data).hexdigest())
+
+		with self.scan_cache_lock:
+			scanned = self.scan_cache.pop(key,None)
+			if scanned:
+				self.scan_cache[key] = scanned
+				return scanned
+
+		header = data[:scan_header(data)]
+		body = data[len(header):]
+
+		if body.startswith('\n'):
+			body = body[1:]
+
+		if body != "" and not body.endswith('\n'):
+			body += '\n'
+
+		directives = []
+		directive_lines = set()
+
+		for index,line in enumerate(header.split('\n')):
+			matches = self.DIRECTIVE_PATTERN.search(line)
+			if matches:
+				parsed = self.parse_directive(matches.group(1))
+				if parsed:
+					name = parsed[0]
+					args = parsed[1:]
+					if hasattr(self,'process_%s_directive'%name):
+						directive = [index+1,str(name)]
+						directive.extend([str(arg) for arg in args])
+						directives.append(tuple(directive))
+						directive_lines.add(index+1)
+
+		processed_header = []
+		for line_no,line in enumerate(header.splitlines(True)):
+			processed_header.append('\n' if line_no+1 in directive_lines else line)
+
+		processed_header = ''.join(processed_header).rstrip('\n')
+		processed_header = processed_header + '\n' if processed_header.strip() != "" else ""
+
+		scanned = (header,body,tuple(directives),processed_header)
+
+		with self.scan_cache_lock:
+			self.scan_cache[key] = scanned
+			while len(self.scan_cache) > self.scan_cache_size:
+				self.scan_cache.popitem(last=False)
+
+		return scanned
+
 	def evaluate(self,scope, locals, block=None):
 		self.context = scope
 		self.result = ""
@@ -43,22 +88,7 @@ class DirectiveProcessor(Template):
 
 	@property
 	def processed_header(self):
-
-		processed_header = []
-
-		line_no = 0
-		for line in self.header.splitlines(True):
-			line_no += 1
-			match = False
-			for directive in self.directives:
-				if directive[0] == line_no:
-					match = True
-			
-			processed_header.append('\n' if match else line)
-
-		header = ''.join(processed_header).rstrip('\n')
-
-		return header + '\n' if not re.search(r"""\A\s*\Z""",header,re.M) else ""
+		return self._processed_header
 
 	@property
 	def processed_source(self):
@@ -83,25 +113,10 @@ class DirectiveProcessor(Template):
 
 	@property
 	def directives(self):
-	
-		directives = []
-		for index,line in enumerate(self.header.split('\n')):
-			matches = self.DIRECTIVE_PATTERN.search(line)
-			if matches:
-				parsed = self.parse_directive(matches.group(1))
-				if parsed:
-					name = parsed[0]
-					args = parsed[1:]
-					if hasattr(self,'process_%s_directive'%name):
-						directive = [index+1,str(name)]
-						directive.extend([str(arg) for arg in args])
-						directives.append(tuple(directive))
-
-		return directives
+		return list(self._directives)
 
 	def process_directives(self):
-		directives = self.directives
-		for directive in directives:
+		for directive in self._directives:
 			self.context.line = directive[0]
 			getattr(self,'process_%s_directive'%directive[1])(*directive[2:])
 			self.context.line = None
@@ -144,12 +159,7 @@ class DirectiveProcessor(Template):
 				raise ArgumentError("require_directory argument must be a directory")
 
 			self.context.depend_on(root)
-			for pathname in self.entries(root):
-				pathname = os.path.join(root,pathname)
-				if pathname ==self._file:
-					continue
-				elif self.context.is_asset_requirable(pathname):
-					self.context.require_asset(pathname)
+			self.require_entries([(os.path.join(root,filename),is_dir) for filename,is_dir in sorted(self.scan_entries(root))])
 
 		else:
 			raise ArgumentError('require_directory argument must be a relative path')
@@ -167,20 +177,30 @@ class DirectiveProcessor(Template):
 				raise ArgumentError("require_directory argument must be a directory")
 
 			self.context.depend_on(root)
-
-			def do_require(pathname,*args):
-				if pathname == self._file:
-					return
-				elif os.path.isdir(pathname):
-					self.context.depend_on(pathname)
-				elif self.context.is_asset_requirable(pathname):
-					self.context.require_asset(pathname)
-
-			self.each_entry(root,callback=do_require)
+			self.require_entries(self.walk_entries(root),depend_on_directories=True)
 
 		else:
 			raise ArgumentError("require_tree argument must be a relative path")
 
+	def require_entries(self,entries,depend_on_directories=False):
+		environment = self.context.environment
+		content_type = self.context.content_type
+		directories = []
+		pathnames = []
+
+		for pathname,is_dir in entries:
+			if pathname == self._file:
+				continue
+			elif is_dir:
+				directories.append(pathname)
+			elif content_type and environment.get_extension_content_type(pathname) == content_type and os.path.isfile(pathname):
+				pathnames.append(pathname)
+
+		if depend_on_directories:
+			self.context.depend_on_paths(directories)
+
+		self.context.require_assets(pathnames)
+
 	def process_depend_on_directive(self,path):
 		self.context.depend_on(path)
 
@@ -199,6 +219,40 @@ class DirectiveProcessor(Template):
 	def each_entry(self,root,callback=None):
 		return self.context.environment.each_entry(root,callback)
 
+	def scan_entries(self,root):
+		return self.context.environment.scan_entries(root)
+
+	def walk_entries(self,root):
+		return self.context.environment.walk_entries(root)
+
+def scan_header(data):
+	length = len(data)
+	position = end = 0
+
+	while True:
+		while position < length and data[position].isspace():
+			position += 1
+
+		if data.startswith('/*',position):
+			close = data.find('*/',position+2)
+			if close == -1:
+				break
+			position = close + 2
+
+		elif data.startswith('###',position) and data.find('###',position+3) != -1:
+			position = data.find('###',position+3) + 3
+
+		elif data.startswith('//',position) or data.startswith('#',position):
+			while position < length and data[position] not in '\r\n':
+				position += 1
+
+		else:
+			break
+
+		end = position
+
+	return end
+
 def is_relative_path(path):
 	return True if re.match(r"""^\.($|\.?\/)""",path) else False
 
@@ -0,0 +1,44 @@
+class ProcessorPipeline(object):
+
+	def __init__(self,processors):
+		self.processors = tuple(processors)
+		self.stateless = tuple([getattr(processor,'stateless',False) for processor in self.processors])
+		self.instances = {}
+
+	def __iter__(self):
+		return iter(self.processors)
+
+	def __len__(self):
+		return len(self.processors)
+
+	def __getitem__(self,index):
+		return self.processors[index]
+
+	def __eq__(self,other):
+		return list(self.processors) == list(other)
+
+	def __ne__(self,other):
+		return not self == other
+
+	def get_instance(self,processor,pathname):
+		instance = self.instances.get(processor)
+
+		if instance is None:
+			instance = self.instances[processor] = processor(pathname,block=lambda x: u'')
+
+		return instance
+
+	def render(self,context,pathname,data):
+
+		for processor,stateless in zip(self.processors,self.stateless):
+			try:
+				if stateless:
+					data = self.get_instance(processor,pathname).call(context,data)
+				else:
+					template = processor(pathname,block=lambda x: data)
+					data = template.render(context,{})
+
+			except Exception,e:
+				context.annotate_exception(e)
+
+		return data
@@ -9,4 +9,7 @@ class Processor(Template):
 		pass
 
 	def evaluate(self,context,local_vars,callback=None):
-		return self.processor(context,self.data)
\ No newline at end of file
+		return self.call(context,self.data)
+
+	def call(self,context,data):
+		return self.processor(context,data)
\ No newline at end of file
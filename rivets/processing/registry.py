@@ -1,4 +1,9 @@
+import itertools
+
 from processor import Processor
+from pipeline import ProcessorPipeline
+
+versions = itertools.count()
 
 class ProcessorRegistry(object):
 
@@ -15,6 +20,17 @@ class ProcessorRegistry(object):
 		self._js_compressor=None
 		self._css_compressor=None
 
+		self.version = next(versions)
+		self.pipelines = {}
+
+	def __getstate__(self):
+		state = self.__dict__.copy()
+		state['pipelines'] = {}
+		return state
+
+	def __setstate__(self,state):
+		self.__dict__.update(state)
+
 	def register_preprocessor(self,mimetype,processor,callback=None):
 		self.register_processor('pre',mimetype,processor,callback)
 
@@ -34,6 +50,7 @@ class ProcessorRegistry(object):
 			self.processors[position][mimetype] = []
 
 		self.processors[position][mimetype].append(processor)
+		self.expire_pipelines()
 
 	def unregister_preprocessor(self,mimetype,processor):
 		return self.unregister_processor('pre',mimetype,processor)
@@ -55,6 +72,7 @@ class ProcessorRegistry(object):
 					if klass.__name__ == processor:
 						self.processors[position][mimetype].remove(klass)
 
+			self.expire_pipelines()
 
 	def get_preprocessors(self,mimetype):
 		return self.get_processors('pre',mimetype)
@@ -71,6 +89,33 @@ class ProcessorRegistry(object):
 		else:
 			return []
 
+	def get_pipeline(self,mimetype,engines=()):
+		key = (self.version,mimetype,tuple(engines))
+		pipeline = self.pipelines.get(key)
+
+		if pipeline is None:
+			processors = []
+			processors.extend(reversed(self.get_preprocessors(mimetype)))
+			processors.extend(reversed(engines))
+			processors.extend(reversed(self.get_postprocessors(mimetype)))
+
+			pipeline = self.pipelines[key] = ProcessorPipeline(processors)
+
+		return pipeline
+
+	def get_bundle_pipeline(self,mimetype):
+		key = (self.version,'bundle',mimetype)
+		pipeline = self.pipelines.get(key)
+
+		if pipeline is None:
+			pipeline = self.pipelines[key] = ProcessorPipeline(self.get_bundleprocessors(mimetype))
+
+		return pipeline
+
+	def expire_pipelines(self):
+		self.version = next(versions)
+		self.pipelines = {}
+
 	def register_compressor(self,mimetype,name,processor):
 		
 		if not self.compressors.has_key(mimetype):
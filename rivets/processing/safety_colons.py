@@ -4,16 +4,21 @@ from lean.template import Template
 
 class SafetyColons(Template):
 
+	stateless = True
+
 	def prepare(self):
 		pass
 
 
 	def evaluate(self,scope, locals, block=None):
+		return self.call(scope,self.data)
+
+	def call(self,scope,data):
 		#self.data = re.sub('\A[\n\r\s]+','',self.data)
 		blank_pattern = re.compile(r"""\A\s*\Z""",re.M)
 		end_pattern = re.compile(r""";\s*\Z""",re.M)
 
-		if re.search(blank_pattern,self.data) or re.search(end_pattern,self.data):
-			return self.data #return "%s\n" % self.data if self.data != "" and not self.data.endswith('\n') else self.data			
+		if re.search(blank_pattern,data) or re.search(end_pattern,data):
+			return data #return "%s\n" % data if data != "" and not data.endswith('\n') else data			
 		else:
-			return "%s;\n" % self.data
\ No newline at end of file
+			return "%s;\n" % data
\ No newline at end of file
@@ -0,0 +1,83 @@
+import threading
+
+try:
+	from collections import OrderedDict
+except ImportError:
+	from ordereddict import OrderedDict
+
+class CachedResponse(object):
+
+	def __init__(self,digest,body,headers):
+		self.digest = digest
+		self.body = body
+		self.headers = headers
+		self.size = len(body)
+
+class ResponseCache(object):
+
+	def __init__(self,max_bytes=32*1024*1024):
+		self.max_bytes = max_bytes
+		self.bytes = 0
+		self.entries = OrderedDict()
+		self.lock = threading.Lock()
+
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+
+	def get(self,key,digest):
+		if not digest:
+			return None
+
+		with self.lock:
+			entry = self.entries.pop(key,None)
+
+			if entry and entry.digest.startswith(digest):
+				self.entries[key] = entry
+				self.hits += 1
+				return entry
+
+			if entry:
+				self.bytes -= entry.size
+
+			self.misses += 1
+			return None
+
+	def set(self,key,digest,body,headers):
+		entry = CachedResponse(digest,body,headers)
+
+		if entry.size > self.max_bytes:
+			return None
+
+		with self.lock:
+			old = self.entries.pop(key,None)
+			if old:
+				self.bytes -= old.size
+
+			self.entries[key] = entry
+			self.bytes += entry.size
+
+			while self.bytes > self.max_bytes:
+				evicted_key,evicted = self.entries.popitem(last=False)
+				self.bytes -= evicted.size
+				self.evictions += 1
+
+		return entry
+
+	def clear(self):
+		with self.lock:
+			self.entries.clear()
+			self.bytes = 0
+
+	def __len__(self):
+		return len(self.entries)
+
+	@property
+	def stats(self):
+		return {
+			'hits':self.hits,
+			'misses':self.misses,
+			'evictions':self.evictions,
+			'entries':len(self.entries),
+			'bytes':self.bytes
+		}
@@ -1,11 +1,61 @@
+import os
+import binascii
+import zlib
 import cherrypy
 import regex as re
 from urllib import unquote_plus
 import traceback
 from wsgiref.handlers import format_date_time
+from email.utils import parsedate_tz, mktime_tz
+
+from assets import StaticAsset
+from response_cache import ResponseCache
+from utils import each_chunk
+
+ENCODINGS = ('br','gzip')
+
+SIDECAR_EXTENSIONS = {
+	'br':'.br',
+	'gzip':'.gz'
+}
+
+COMPRESSIBLE_TYPES = (
+	'application/javascript',
+	'application/json',
+	'application/xml',
+	'image/svg+xml'
+)
+
+CACHED_HEADERS = (
+	'Content-Type',
+	'Content-Length',
+	'Content-Encoding',
+	'Cache-Control',
+	'Last-Modified',
+	'ETag',
+	'Vary',
+	'Accept-Ranges'
+)
+
+try:
+	import brotli
+except ImportError:
+	brotli = None
+
+def parse_http_date(value):
+	if not value:
+		return None
+
+	parsed = parsedate_tz(value)
+	return mktime_tz(parsed) if parsed else None
+
+def weak_etag(etag):
+	return etag[2:] if etag.startswith('W/') else etag
 
 class Server(object):
 
+	response_cache_size = 32*1024*1024
+
 	def run(self,path,**kwargs):
 
 		path = unquote_plus(path).encode('utf8')
@@ -15,10 +65,17 @@ class Server(object):
 			if self.is_forbidden_request(path):
 				return self.forbidden_response()
 
+			cache_key = self.response_cache_key(path)
+
 			fingerprint = self.path_fingerprint(path)
 			if fingerprint:
 				path = re.sub("-%s"%fingerprint,'',path)
 
+				if cache_key:
+					entry = self.response_cache.get(cache_key,fingerprint)
+					if entry:
+						return self.cached_response(entry)
+
 			# Look up the asset
 			asset = self.find_asset(path,bundle= not self.is_body_only())
 
@@ -26,8 +83,18 @@ class Server(object):
 				return self.not_found_response()
 			elif self.etag_match(asset):
 				return self.not_modified_response(asset)
-			else:
-				return self.ok_response(asset)
+
+			if cache_key and not fingerprint:
+				entry = self.response_cache.get(cache_key,asset.digest)
+				if entry:
+					return self.cached_response(entry)
+
+			body = self.ok_response(asset)
+
+			if cache_key and isinstance(body,str):
+				self.response_cache.set(cache_key,asset.digest,body,self.cacheable_headers())
+
+			return body
 
 		except cherrypy.HTTPError:
 			raise
@@ -40,6 +107,32 @@ class Server(object):
 			else:
 				raise
 
+	@property
+	def response_cache(self):
+		if getattr(self,'_response_cache',None) is None:
+			self._response_cache = ResponseCache(self.response_cache_size)
+		return self._response_cache
+
+	def response_cache_key(self,path):
+		if not self.response_cache_size or cherrypy.request.headers.get('Range',None):
+			return None
+
+		return (path,bool(self.is_body_only()),self.acceptable_encodings())
+
+	def cacheable_headers(self):
+		headers = {}
+		for name in CACHED_HEADERS:
+			if cherrypy.response.headers.has_key(name):
+				headers[name] = cherrypy.response.headers[name]
+		return headers
+
+	def cached_response(self,entry):
+		if self.is_not_modified(entry.headers.get('ETag'),parse_http_date(entry.headers.get('Last-Modified'))):
+			return self.not_modified_response(None,entry.headers.get('ETag'))
+
+		cherrypy.response.headers.update(entry.headers)
+		return entry.body
+
 	def is_forbidden_request(self,path):
 		''' Prevent access to files elsewhere on the file system
         
@@ -125,21 +218,260 @@ body:after {
 		return content
 
 	def etag_match(self,asset):
-		return cherrypy.request.headers.get('Http-If-None-Match',None) == self.etag(asset)
+		return self.is_not_modified(self.etag(asset),asset.mtime)
+
+	def is_not_modified(self,etag,mtime=None):
+		if_none_match = cherrypy.request.headers.get('If-None-Match',None)
+
+		if if_none_match:
+			return self.if_none_match(etag,if_none_match)
+
+		if_modified_since = parse_http_date(cherrypy.request.headers.get('If-Modified-Since',None))
+
+		if if_modified_since is not None and mtime is not None:
+			return int(mtime) <= if_modified_since
+
+		return False
+
+	def if_none_match(self,etag,header):
+		if not etag:
+			return False
+
+		if header.strip() == '*':
+			return True
+
+		etag = weak_etag(etag)
+
+		for candidate in header.split(','):
+			if weak_etag(candidate.strip()) == etag:
+				return True
+
+		return False
 
 	def is_body_only(self):
 		return cherrypy.request.params.get('body',False) and cherrypy.request.params.get('body',False) != 'false'
 
-	def not_modified_response(self,asset):
+	def not_modified_response(self,asset,etag=None):
 		cherrypy.response.headers['Content-Type']=None
 		cherrypy.response.headers['Content-Length']=None
 		cherrypy.response.headers['Last-Modified']=None
+
+		etag = self.etag(asset) if asset else etag
+		if etag:
+			cherrypy.response.headers['ETag']=etag
 		cherrypy.response.status = 304
 
 	def ok_response(self,asset):
+
+		if isinstance(asset,StaticAsset):
+			ranges = self.requested_ranges(asset)
+
+			if ranges is not None:
+				return self.partial_response(asset,ranges)
+
+		encoding = self.negotiate_encoding(asset)
+
+		if encoding:
+			return self.encoded_response(asset,encoding)
+
 		self.headers(asset,asset.length)
+
+		if isinstance(asset,StaticAsset):
+			return self.stream_response(asset)
+
 		return str(asset)
 
+	def encoded_response(self,asset,encoding):
+		sidecar = self.sidecar_for(asset,encoding)
+
+		if sidecar:
+			self.headers(asset,os.stat(sidecar).st_size)
+			cherrypy.response.headers['Content-Encoding'] = encoding
+			cherrypy.response.stream = True
+			return each_chunk(sidecar)
+
+		body = self.compress(str(asset),encoding)
+		self.headers(asset,len(body))
+		cherrypy.response.headers['Content-Encoding'] = encoding
+		return body
+
+	def compress(self,data,encoding):
+		if encoding == 'br':
+			return brotli.compress(data)
+
+		compressor = zlib.compressobj(9,zlib.DEFLATED,31)
+		return compressor.compress(data) + compressor.flush()
+
+	def negotiate_encoding(self,asset):
+		if not self.is_compressible(asset):
+			return None
+
+		for encoding in self.acceptable_encodings():
+			if encoding != 'br' or brotli or self.sidecar_for(asset,encoding):
+				return encoding
+
+		return None
+
+	def acceptable_encodings(self):
+		accepted = self.accepted_encodings()
+		qualities = []
+
+		for position,encoding in enumerate(ENCODINGS):
+			quality = accepted.get(encoding,accepted.get('*',0))
+			if quality > 0:
+				qualities.append((-quality,position,encoding))
+
+		return tuple([encoding for quality,position,encoding in sorted(qualities)])
+
+	def accepted_encodings(self):
+		header = cherrypy.request.headers.get('Accept-Encoding','')
+		accepted = {}
+
+		for part in header.split(','):
+			params = part.strip().split(';')
+			encoding = params[0].strip().lower()
+
+			if not encoding:
+				continue
+
+			quality = 1.0
+			for param in params[1:]:
+				name,sep,value = param.strip().partition('=')
+				if name.strip() == 'q':
+					try:
+						quality = float(value)
+					except ValueError:
+						quality = 0
+
+			accepted[encoding] = quality
+
+		return accepted
+
+	def is_compressible(self,asset):
+		if not isinstance(asset,StaticAsset):
+			return True
+
+		for encoding in ENCODINGS:
+			if self.sidecar_for(asset,encoding):
+				return True
+
+		content_type = asset.content_type.split(';')[0]
+		return content_type.startswith('text/') or content_type in COMPRESSIBLE_TYPES
+
+	def sidecar_for(self,asset,encoding):
+		if not isinstance(asset,StaticAsset):
+			return None
+
+		sidecar = "%s%s" % (asset.pathname,SIDECAR_EXTENSIONS[encoding])
+
+		if os.path.isfile(sidecar) and int(os.stat(sidecar).st_mtime) >= asset.mtime:
+			return sidecar
+
+		return None
+
+	def stream_response(self,asset,start=0,stop=None):
+		cherrypy.response.stream = True
+		return asset.each_chunk(start=start,stop=stop)
+
+	def partial_response(self,asset,ranges):
+
+		if not ranges:
+			return self.range_not_satisfiable_response(asset)
+
+		cherrypy.response.status = 206
+
+		if len(ranges) == 1:
+			start,stop = ranges[0]
+			self.headers(asset,stop - start)
+			cherrypy.response.headers['Content-Range'] = 'bytes %d-%d/%d' % (start,stop - 1,asset.length)
+			return self.stream_response(asset,start,stop)
+
+		boundary = binascii.b2a_hex(os.urandom(16))
+		parts = []
+		length = 0
+
+		for start,stop in ranges:
+			part_header = '\r\n--%s\r\nContent-Type: %s\r\nContent-Range: bytes %d-%d/%d\r\n\r\n' % (boundary,asset.content_type,start,stop - 1,asset.length)
+			parts.append((part_header,start,stop))
+			length += len(part_header) + stop - start
+
+		closing = '\r\n--%s--\r\n' % boundary
+		length += len(closing)
+
+		self.headers(asset,length)
+		cherrypy.response.headers['Content-Type'] = 'multipart/byteranges; boundary=%s' % boundary
+
+		def each_part():
+			for part_header,start,stop in parts:
+				yield part_header
+				for chunk in asset.each_chunk(start=start,stop=stop):
+					yield chunk
+			yield closing
+
+		cherrypy.response.stream = True
+		return each_part()
+
+	def range_not_satisfiable_response(self,asset):
+		cherrypy.response.headers['Content-Type']=None
+		cherrypy.response.headers['Content-Range']='bytes */%d' % asset.length
+		cherrypy.response.headers['Content-Length']='0'
+		cherrypy.response.status = 416
+		return ''
+
+	def requested_ranges(self,asset):
+		header = cherrypy.request.headers.get('Range',None)
+
+		if not header or not self.if_range_match(asset):
+			return None
+
+		return self.parse_byte_ranges(header,asset.length)
+
+	def if_range_match(self,asset):
+		if_range = cherrypy.request.headers.get('If-Range',None)
+
+		if not if_range:
+			return True
+
+		return if_range == self.etag(asset) or if_range == format_date_time(asset.mtime)
+
+	def parse_byte_ranges(self,header,length):
+		units,sep,spec = header.partition('=')
+
+		if units.strip().lower() != 'bytes' or not sep:
+			return None
+
+		ranges = []
+
+		for part in spec.split(','):
+			part = part.strip()
+
+			if '-' not in part:
+				return None
+
+			first,last = [value.strip() for value in part.split('-',1)]
+
+			try:
+				if first == '':
+					if last == '':
+						return None
+					suffix = int(last)
+					if suffix > 0 and length > 0:
+						ranges.append((max(length - suffix,0),length))
+				else:
+					start = int(first)
+					if last != '':
+						stop = int(last) + 1
+						if stop <= start:
+							return None
+					else:
+						stop = length
+					if start < length:
+						ranges.append((start,min(stop,length)))
+			except ValueError:
+				return None
+
+		return ranges
+
 	def headers(self,asset,length):
 		cherrypy.response.headers['Content-Type']=asset.content_type
 		cherrypy.response.headers['Content-Length']=str(length)
@@ -148,13 +480,19 @@ body:after {
 		cherrypy.response.headers['Last-Modified']=format_date_time(asset.mtime)
 		cherrypy.response.headers["ETag"] = self.etag(asset)
 
+		if isinstance(asset,StaticAsset):
+			cherrypy.response.headers['Accept-Ranges'] = 'bytes'
+
+		if self.is_compressible(asset):
+			cherrypy.response.headers['Vary'] = 'Accept-Encoding'
+
 		if self.path_fingerprint(cherrypy.request.path_info):
 			cherrypy.response.headers["Cache-Control"] += ", max-age=31536000"
 		else:
 			cherrypy.response.headers["Cache-Control"] += ", must-revalidate"
 
 	def path_fingerprint(self,path):
-		matches = re.findall(r"""-([0-9a-f]{7,40})\.[^.]+$""",path)
+		matches = re.findall(r"""-([0-9a-f]{7,128})\.[^.]+$""",path)
 		return matches[0] if matches else None
 
 	def etag(self,asset):
@@ -1,6 +1,14 @@
 import codecs
 import re
 
+try:
+	from os import scandir
+except ImportError:
+	try:
+		from scandir import scandir
+	except ImportError:
+		scandir = None
+
 UTF8_BOM_PATTERN = re.compile("\\A(\\xFE\\xFF|\\xFF\\xFE)".encode('utf-8'))
 
 def read_unicode(filename,external_encoding='utf8'):
@@ -11,7 +19,31 @@ def read_unicode(filename,external_encoding='utf8'):
 	else:
 		return unicode(data).encode('utf8')
 
+def memoized_property(fn):
+	name = '_%s' % fn.__name__
+
+	def getter(self):
+		if name not in self.__dict__:
+			self.__dict__[name] = fn(self)
+		return self.__dict__[name]
+
+	return property(getter,doc=fn.__doc__)
+
 def unique_list(seq):
 	seen = set()
 	seen_add = seen.add
-	return [x for x in seq if x not in seen and not seen_add(x)]
\ No newline at end of file
+	return [x for x in seq if x not in seen and not seen_add(x)]
+
+def each_chunk(filename,chunk_size=16384,start=0,stop=None):
+	with open(filename,'rb') as f:
+		f.seek(start)
+		remaining = stop - start if stop is not None else None
+
+		while remaining is None or remaining > 0:
+			buf = f.read(chunk_size if remaining is None else min(chunk_size,remaining))
+			if buf:
+				if remaining is not None:
+					remaining -= len(buf)
+				yield buf
+			else:
+				break
\ No newline at end of file
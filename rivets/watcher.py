@@ -0,0 +1,105 @@
+import os
+import threading
+
+class PollingWatcher(object):
+
+	def __init__(self,paths,callback,interval=1.0):
+		self.paths = list(paths)
+		self.callback = callback
+		self.interval = interval
+		self.snapshot = {}
+		self._stop = threading.Event()
+		self._thread = None
+
+	def start(self):
+		self.snapshot = self.scan()
+		self._thread = threading.Thread(target=self.run)
+		self._thread.daemon = True
+		self._thread.start()
+
+	def stop(self):
+		self._stop.set()
+		if self._thread:
+			self._thread.join()
+			self._thread = None
+
+	def run(self):
+		while not self._stop.is_set():
+			self._stop.wait(self.interval)
+			if not self._stop.is_set():
+				self.poll()
+
+	def poll(self):
+		snapshot = self.scan()
+		changed = set()
+
+		for path,stat in snapshot.iteritems():
+			if self.snapshot.get(path) != stat:
+				changed.add(path)
+				if not self.snapshot.has_key(path):
+					changed.add(os.path.dirname(path))
+
+		for path in self.snapshot.iterkeys():
+			if not snapshot.has_key(path):
+				changed.add(path)
+				changed.add(os.path.dirname(path))
+
+		self.snapshot = snapshot
+
+		if changed:
+			self.callback(sorted(changed))
+
+		return changed
+
+	def scan(self):
+		snapshot = {}
+
+		for root in self.paths:
+			for dirpath,dirnames,filenames in os.walk(root):
+				for name in dirnames + filenames:
+					path = os.path.join(dirpath,name)
+					try:
+						stat = os.stat(path)
+					except OSError:
+						continue
+					snapshot[path] = (stat.st_mtime,stat.st_size)
+
+		return snapshot
+
+class InotifyWatcher(object):
+
+	def __init__(self,paths,callback):
+		import pyinotify
+
+		self.paths = list(paths)
+		self.callback = callback
+
+		mask = pyinotify.IN_MODIFY | pyinotify.IN_ATTRIB | pyinotify.IN_CREATE | pyinotify.IN_DELETE | pyinotify.IN_MOVED_FROM | pyinotify.IN_MOVED_TO
+		watcher = self
+
+		class Handler(pyinotify.ProcessEvent):
+
+			def process_default(self,event):
+				changed = [event.pathname]
+				if event.mask & (pyinotify.IN_CREATE | pyinotify.IN_DELETE | pyinotify.IN_MOVED_FROM | pyinotify.IN_MOVED_TO):
+					changed.append(os.path.dirname(event.pathname))
+				watcher.callback(changed)
+
+		self.manager = pyinotify.WatchManager()
+		self.notifier = pyinotify.ThreadedNotifier(self.manager,Handler())
+		self.notifier.daemon = True
+
+		for path in self.paths:
+			self.manager.add_watch(path,mask,rec=True,auto_add=True)
+
+	def start(self):
+		self.notifier.start()
+
+	def stop(self):
+		self.notifier.stop()
+
+def get_watcher(paths,callback,interval=1.0):
+	try:
+		return InotifyWatcher(paths,callback)
+	except ImportError:
+		return PollingWatcher(paths,callback,interval)
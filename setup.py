@@ -1,5 +1,11 @@
+import sys
 from setuptools import setup
 
+install_requires = ['crawl>=0.5.5','lean>=0.2.3','cherrypy','regex','scandir']
+
+if sys.version_info < (2,7):
+	install_requires.append('ordereddict')
+
 setup(name='Rivets',
 	  version='0.4.1',
 	  url='https://github.com/OiNutter/rivets',
@@ -10,7 +16,7 @@ setup(name='Rivets',
 	  packages=['rivets'],
 	  include_package_data=True,
 	  package_data={'rivets': ['rivets/*.py','rivets/assets/*.py']},
-	  install_requires=['crawl>=0.5.5','lean>=0.2.3','cherrypy','regex'],
+	  install_requires=install_requires,
 	  license='MIT License',
 	  classifiers=[
 	  		'Development Status :: 3 - Alpha',
@@ -0,0 +1,46 @@
+import sys
+sys.path.insert(0,'../')
+import os
+import time
+
+from rivets.file_digests import DIGEST_ALGORITHMS, get_digest_class
+from rivets.utils import each_chunk
+
+FIXTURE_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__),'fixtures'))
+
+def fixture_files():
+	files = []
+	for dirpath,dirnames,filenames in os.walk(FIXTURE_ROOT):
+		for filename in filenames:
+			files.append(os.path.join(dirpath,filename))
+	return sorted(files)
+
+def benchmark(digest_class,files,rounds):
+	start = time.time()
+	size = 0
+
+	for i in range(rounds):
+		for path in files:
+			digest = digest_class()
+			for chunk in each_chunk(path):
+				digest.update(chunk)
+				size += len(chunk)
+			digest.hexdigest()
+
+	return time.time() - start,size
+
+if __name__ == '__main__':
+	rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+	files = fixture_files()
+
+	print "Hashing %d fixture files %d times" % (len(files),rounds)
+
+	for name in DIGEST_ALGORITHMS:
+		try:
+			digest_class = get_digest_class(name)
+		except ImportError:
+			print "%-8s unavailable" % name
+			continue
+
+		elapsed,size = benchmark(digest_class,files,rounds)
+		print "%-8s %8.3fs %8.1f MB/s" % (name,elapsed,size / elapsed / (1024 * 1024) if elapsed else 0)
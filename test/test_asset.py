@@ -5,6 +5,8 @@ if sys.version_info[:2] == (2,6):
 else:
 	import unittest
 import os
+import shutil
+import tempfile
 import time,datetime
 import regex as re
 
@@ -678,6 +680,80 @@ class BundledAssetTest(RivetsTest,AssetTests,FreshnessTests):
 		''' Test logical path can find itself '''
 		self.assertEqual(self.asset,self.env[self.asset.logical_path])
 
+	def testBundleIsAssembledFromSegments(self):
+		''' Test bundle is assembled from segments '''
+		segments = self.asset.segments
+
+		self.assertEqual([asset.pathname for asset in self.asset.to_list()],[segment.pathname for segment in segments])
+		self.assertEqual([asset.digest for asset in self.asset.to_list()],[segment.digest for segment in segments])
+
+		offset = 0
+		for segment in segments:
+			self.assertEqual(offset,segment.offset)
+			offset += segment.length
+
+		self.assertEqual(self.asset.length,offset)
+		self.assertEqual(''.join([segment.source for segment in segments]),str(self.asset))
+
+	def testDigestIsSegmentDigest(self):
+		''' Test digest is computed from segment digests '''
+		digest = self.env.digest
+		for segment in self.asset.segments:
+			digest.update(segment.digest)
+
+		self.assertEqual(digest.hexdigest(),self.asset.digest)
+
+	def testDigestIsSourceDigest(self):
+		''' Test digest of bundles with bundle processors is source digest '''
+		asset = self.env['project.css']
+		assert self.env.processors.get_bundle_pipeline(asset.content_type)
+
+		digest = self.env.digest
+		digest.update(str(asset))
+
+		self.assertEqual(digest.hexdigest(),asset.digest)
+
+	def testRebuildDoesNotReadCachedSegmentBodies(self):
+		''' Test rebuilding a bundle from cached processed assets leaves their bodies unread '''
+		root = tempfile.mkdtemp()
+
+		try:
+			env1 = rivets.Environment()
+			env1.append_path(self.fixture_path('asset'))
+			env1.cache = rivets.caching.FileStore(root)
+			asset = env1['application.js']
+
+			env2 = rivets.Environment()
+			env2.append_path(self.fixture_path('asset'))
+			env2.cache = rivets.caching.FileStore(root)
+			rebuilt = rivets.assets.BundledAsset(env2.index,asset.logical_path,asset.pathname)
+
+			self.assertTrue(all([callable(segment._source) for segment in rebuilt.segments]))
+			self.assertEqual(asset.digest,rebuilt.digest)
+			self.assertEqual(asset.length,rebuilt.length)
+			self.assertEqual(str(asset),str(rebuilt))
+		finally:
+			shutil.rmtree(root)
+
+	def testSegmentsAreStoredInCache(self):
+		''' Test segments are stored in cache '''
+		env = rivets.Environment()
+		env.append_path(self.fixture_path('asset'))
+		env.cache = rivets.caching.MemoryStore()
+
+		asset = env['application.js']
+		asset_hash = env.cache_get_hash(env.cache_key_for(asset.pathname,bundle=True))
+
+		self.assertEqual(
+				[[asset.relativize_root_path(segment.pathname),segment.digest,segment.offset,segment.length] for segment in asset.segments],
+				asset_hash['segments']
+			)
+
+		cached = rivets.assets.Asset.from_hash(env.index,asset_hash)
+
+		self.assertEqual(asset.digest,cached.digest)
+		self.assertEqual([segment.source for segment in asset.segments],[segment.source for segment in cached.segments])
+
 	def testClass(self):
 		''' Test class '''
 		self.assertIsInstance(self.asset,rivets.assets.BundledAsset)
@@ -1034,6 +1110,34 @@ class BundledAssetTest(RivetsTest,AssetTests,FreshnessTests):
 
 		assert re.match(r"""project-\w+\.js""",self.get_asset("project.js").digest_path)
 
+	def testAssetDigestPathUsesFingerprintLength(self):
+		''' Test asset digest path uses the environment fingerprint length '''
+
+		self.env.fingerprint_length = 8
+		asset = self.get_asset("project.js")
+
+		self.assertEqual(asset.digest[:8],asset.fingerprint)
+		self.assertEqual("project-%s.js"%asset.digest[:8],asset.digest_path)
+
+	def testFingerprintLengthMustMatchServerPattern(self):
+		''' Test fingerprint length outside the range the server recognizes is rejected '''
+
+		def set_length(value):
+			self.env.fingerprint_length = value
+
+		self.assertRaises(rivets.errors.ArgumentError,set_length,6)
+		self.assertRaises(rivets.errors.ArgumentError,set_length,129)
+		set_length(7)
+		self.assertEqual(7,self.env.fingerprint_length)
+
+	def testSelectableDigestAlgorithm(self):
+		''' Test selectable digest algorithm '''
+
+		self.env.use_digest('sha256')
+		self.assertEqual(64,len(self.get_asset("project.js").digest))
+
+		self.assertRaises(rivets.errors.ArgumentError,self.env.use_digest,'crc32')
+
 	def testAssetIsFreshIfItsMtimeAndContentsAreTheSame(self):
 		''' Test asset is fresh if its mtime and contents are the same '''
 
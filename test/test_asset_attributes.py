@@ -17,9 +17,9 @@ class TestAssetAttributes(RivetsTest):
 		return env.get_attributes_for(path)
 
 	def test_search_paths(self):
-		self.assertEqual(["index.js","index/component.json"],self.pathname("index.js").search_paths)
-		self.assertEqual(["foo.js","foo/component.json","foo/index.js"],self.pathname("foo.js").search_paths)
-		self.assertEqual(["foo/bar.js","foo/bar/index.js"],self.pathname("foo/bar.js").search_paths)
+		self.assertEqual(("index.js","index/component.json"),self.pathname("index.js").search_paths)
+		self.assertEqual(("foo.js","foo/component.json","foo/index.js"),self.pathname("foo.js").search_paths)
+		self.assertEqual(("foo/bar.js","foo/bar/index.js"),self.pathname("foo/bar.js").search_paths)
 
 	def test_logical_path(self):
 		self.assertEqual("application.js",self.pathname(self.fixture_path('default/application.js')).logical_path)
@@ -33,22 +33,44 @@ class TestAssetAttributes(RivetsTest):
 		self.assertEqual("application.css",self.pathname(self.fixture_path("default/application.scss")).logical_path)
 
 	def test_extensions(self):
-		self.assertEqual([],self.pathname('empty').extensions)
-		self.assertEqual([".js"],self.pathname('gallery.js').extensions)
-		self.assertEqual([".js",".coffee"],self.pathname('application.js.coffee').extensions)
+		self.assertEqual((),self.pathname('empty').extensions)
+		self.assertEqual((".js",),self.pathname('gallery.js').extensions)
+		self.assertEqual((".js",".coffee"),self.pathname('application.js.coffee').extensions)
+
+	def test_extensions_are_stable_across_accesses(self):
+		attributes = self.pathname('application.js.coffee')
+		attributes.extensions
+		self.assertEqual((".js",".coffee"),attributes.extensions)
+
+	def test_attributes_are_cached_per_path(self):
+		env = rivets.Environment()
+		attributes = env.get_attributes_for("foo.ms")
+		self.assertIs(attributes,env.get_attributes_for("foo.ms"))
+		self.assertEqual((),attributes.engine_extensions)
+
+		env.register_engine('.ms',object())
+		self.assertIsNot(attributes,env.get_attributes_for("foo.ms"))
+		self.assertEqual((".ms",),env.get_attributes_for("foo.ms").engine_extensions)
+
+	def test_indexes_share_environment_attributes(self):
+		env = rivets.Environment()
+		env.append_path(self.fixture_path('default'))
+		attributes = env.get_attributes_for("gallery.js")
+		self.assertIs(attributes,env.index.get_attributes_for("gallery.js"))
+		self.assertIs(attributes,env.index.get_attributes_for("gallery.js"))
 
 	def test_format_extension(self):
-		self.assertEqual([],self.pathname('empty').engine_extensions)
-		self.assertEqual([],self.pathname('gallery.js').engine_extensions)
-		self.assertEqual([".coffee"],self.pathname('application.js.coffee').engine_extensions)
-		self.assertEqual([],self.pathname('jquery.js').engine_extensions)
-		self.assertEqual([],self.pathname('jquery.min.js').engine_extensions)
-		self.assertEqual([],self.pathname('jquery.tmpl.min.js').engine_extensions)
-		self.assertEqual([".coffee"],self.pathname('jquery.min.coffee').engine_extensions)
+		self.assertEqual((),self.pathname('empty').engine_extensions)
+		self.assertEqual((),self.pathname('gallery.js').engine_extensions)
+		self.assertEqual((".coffee",),self.pathname('application.js.coffee').engine_extensions)
+		self.assertEqual((),self.pathname('jquery.js').engine_extensions)
+		self.assertEqual((),self.pathname('jquery.min.js').engine_extensions)
+		self.assertEqual((),self.pathname('jquery.tmpl.min.js').engine_extensions)
+		self.assertEqual((".coffee",),self.pathname('jquery.min.coffee').engine_extensions)
 
 		env = rivets.Environment()
 		env.register_engine('.ms',object())
-		self.assertEqual([".ms"],env.get_attributes_for("foo.ms").engine_extensions)
+		self.assertEqual((".ms",),env.get_attributes_for("foo.ms").engine_extensions)
 
 	def test_content_type(self):
 		self.assertEqual("application/octet-stream",self.pathname("empty").content_type)
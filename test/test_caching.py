@@ -6,6 +6,7 @@ else:
 	import unittest
 import os
 import tempfile
+import shutil
 
 from rivets_test import RivetsTest
 import rivets
@@ -233,6 +234,311 @@ class TestFileStore(RivetsTest):
 		assert asset2.equals(asset1)
 		assert asset1 != asset2
 
+
+	def testDeleteRemovesEntry(self):
+		''' Test delete removes entry '''
+
+		self.cache.set('rivets/test-delete',{'a':1})
+		self.assertEqual({'a':1},self.cache.get('rivets/test-delete'))
+
+		self.cache.delete('rivets/test-delete')
+		self.assertIsNone(self.cache.get('rivets/test-delete'))
+
+class TestBoundedFileStore(RivetsTest):
+
+	def setUp(self):
+		self.root = tempfile.mkdtemp()
+		self.cache = rivets.caching.FileStore(self.root,max_size=4096)
+
+	def tearDown(self):
+		shutil.rmtree(self.root)
+
+	def testPrunesLeastRecentlyUsedEntries(self):
+		''' Test prunes least recently used entries when over max size '''
+
+		for i in range(10):
+			self.cache.set('rivets/%032d'%i,'x'*1024)
+
+		assert self.cache.current_size() <= 4096
+		self.assertIsNone(self.cache.get('rivets/%032d'%0))
+		self.assertEqual('x'*1024,self.cache.get('rivets/%032d'%9))
+
+	def testReadsRefreshRecency(self):
+		''' Test reads refresh recency without touching the file '''
+
+		for i in range(3):
+			self.cache.set('rivets/%032d'%i,'x'*1024)
+
+		path = self.cache.path_for('rivets/%032d'%0)
+		mtime = os.stat(path).st_mtime
+
+		self.cache.get('rivets/%032d'%0)
+		self.cache.set('rivets/%032d'%3,'x'*1024)
+
+		self.assertEqual(mtime,os.stat(path).st_mtime)
+		self.assertEqual('x'*1024,self.cache.get('rivets/%032d'%0))
+		self.assertIsNone(self.cache.get('rivets/%032d'%1))
+
+class TestMemoryStore(RivetsTest):
+
+	def setUp(self):
+		self.cache = rivets.caching.MemoryStore(max_size=10)
+
+	def testEvictsLeastRecentlyUsedEntries(self):
+		''' Test evicts least recently used entries by size '''
+
+		self.cache.set('a','aaaa')
+		self.cache.set('b','bbbb')
+		self.cache.get('a')
+		self.cache.set('c','cccc')
+
+		self.assertEqual('aaaa',self.cache.get('a'))
+		self.assertIsNone(self.cache.get('b'))
+		self.assertEqual('cccc',self.cache.get('c'))
+
+	def testEnvironmentUsesMemoryStore(self):
+		''' Test environment caches assets in memory store '''
+
+		env = rivets.Environment(self.fixture_path('default'))
+		env.append_path('.')
+		env.cache = rivets.caching.MemoryStore()
+
+		asset = env['gallery.js']
+		assert len(env.cache)
+		assert env['gallery.js'].equals(asset)
+
+class TestMultiStore(RivetsTest):
+
+	def testBackfillsUpperStores(self):
+		''' Test hits in lower stores are copied into upper stores '''
+
+		memory = rivets.caching.MemoryStore()
+		disk = rivets.caching.MemoryStore()
+		cache = rivets.caching.MultiStore(memory,disk)
+
+		disk.set('key','value')
+		self.assertIsNone(memory.get('key'))
+
+		self.assertEqual('value',cache.get('key'))
+		self.assertEqual('value',memory.get('key'))
+
+		cache.delete('key')
+		self.assertIsNone(cache.get('key'))
+
+class TestCompactSerialization(RivetsTest):
+
+	def testRoundTripKeepsMetadataAndLazyBody(self):
+		''' Test compact format round trips metadata and defers the body '''
+
+		asset_hash = {'class':'ProcessedAsset','logical_path':'gallery.js','mtime':1,'source':'var Gallery = {};\n'}
+		loaded = rivets.caching.compact.load(rivets.caching.compact.dump(asset_hash))
+
+		self.assertEqual('gallery.js',loaded['logical_path'])
+		assert callable(loaded['source'])
+		self.assertEqual('var Gallery = {};\n',loaded['source']())
+
+	def testFileStoreLoadsAssetsFromCompactFormat(self):
+		''' Test file store loads cached assets from the compact format '''
+
+		root = tempfile.mkdtemp()
+
+		try:
+			env1 = rivets.Environment(self.fixture_path('default'))
+			env1.append_path('.')
+			env1.cache = rivets.caching.FileStore(root)
+
+			env2 = rivets.Environment(self.fixture_path('default'))
+			env2.append_path('.')
+			env2.cache = rivets.caching.FileStore(root)
+
+			asset1 = env1['application.js']
+			asset2 = env2['application.js']
+
+			assert asset1.equals(asset2)
+			self.assertEqual(str(asset1),str(asset2))
+		finally:
+			shutil.rmtree(root)
+
+	def testFileStoreLeavesCompactBodiesOnDisk(self):
+		''' Test file store reads compact headers and loads bodies on first access '''
+
+		root = tempfile.mkdtemp()
+
+		try:
+			record = rivets.caching.compact.dump({'digest':'abc','source':'x'*1024})
+			disk = rivets.caching.FileStore(root)
+			disk.set('rivets/%032d'%1,record)
+
+			memory = rivets.caching.MemoryStore()
+			cache = rivets.caching.MultiStore(memory,disk)
+
+			value = cache.get('rivets/%032d'%1)
+			self.assertEqual('abc',value['digest'])
+			self.assertIsInstance(value['source'],rivets.caching.compact.FileBody)
+			self.assertIsNone(value['source'].body)
+			self.assertEqual(len('digest') + len('abc') + len('source') + 1024,memory.size)
+
+			self.assertEqual('x'*1024,value['source']())
+			self.assertEqual('x'*1024,memory.get('rivets/%032d'%1)['source']())
+		finally:
+			shutil.rmtree(root)
+
+class TestContentAddressedBodies(RivetsTest):
+
+	def testIdenticalBodiesAreStoredOnce(self):
+		''' Test identical processed and bundled bodies are stored once '''
+
+		cache = rivets.caching.MemoryStore()
+
+		env1 = rivets.Environment(self.fixture_path('default'))
+		env1.append_path('.')
+		env1.cache = cache
+
+		asset1 = env1['gallery.js']
+
+		bodies = [key for key in cache.entries.keys() if key.startswith('rivets/bodies/')]
+		self.assertEqual(1,len(bodies))
+
+		env2 = rivets.Environment(self.fixture_path('default'))
+		env2.append_path('.')
+		env2.cache = cache
+
+		asset2 = env2['gallery.js']
+		assert asset1.equals(asset2)
+		self.assertEqual(str(asset1),str(asset2))
+
+	def testBundlesReferenceSegmentBodies(self):
+		''' Test bundles store references to segment bodies instead of the joined source '''
+
+		cache = rivets.caching.MemoryStore()
+
+		env = rivets.Environment()
+		env.append_path(self.fixture_path('asset'))
+		env.cache = cache
+
+		asset = env['application.js']
+		assert len(asset.segments) > 1
+
+		bodies = [rivets.caching.compact.load(cache.get(key))['source']() for key in cache.entries.keys() if key.startswith('rivets/bodies/')]
+		self.assertEqual(sorted(set([segment.source for segment in asset.segments])),sorted(bodies))
+
+		cached = rivets.assets.Asset.from_hash(env.index,env.cache_get_hash(env.cache_key_for(asset.pathname,bundle=True)))
+		self.assertEqual(str(asset),str(cached))
+
+	def testMetadataLookupsLeaveBodiesOnDisk(self):
+		''' Test cached asset metadata is loaded without reading the body '''
+
+		root = tempfile.mkdtemp()
+
+		try:
+			env = rivets.Environment(self.fixture_path('default'))
+			env.append_path('.')
+			env.cache = rivets.caching.FileStore(root)
+
+			asset = env['gallery.js']
+			asset_hash = env.cache_get_hash(env.cache_key_for(asset.pathname,bundle=True))
+
+			self.assertIsInstance(asset_hash['segment_sources'][0],rivets.caching.compact.FileBody)
+			self.assertIsNone(asset_hash['segment_sources'][0].body)
+		finally:
+			shutil.rmtree(root)
+
+class TestFileDigestCache(RivetsTest):
+
+	def setUp(self):
+		rivets.file_digests.file_digest_cache.clear()
+
+		self.env = rivets.Environment(self.fixture_path('default'))
+		self.env.append_path('.')
+
+		self.computed = []
+		compute_file_digest = rivets.base.Base.compute_file_digest
+
+		def record_compute(env,path,stats):
+			self.computed.append(path)
+			return compute_file_digest(env,path,stats)
+
+		self.original_compute_file_digest = compute_file_digest
+		rivets.base.Base.compute_file_digest = record_compute
+
+	def tearDown(self):
+		rivets.base.Base.compute_file_digest = self.original_compute_file_digest
+
+	def testDigestSurvivesAcrossIndexInstances(self):
+		''' Test file digests are reused across index instances '''
+
+		path = self.fixture_path('default/gallery.js')
+
+		digest1 = self.env.index.get_file_digest(path).hexdigest()
+		digest2 = self.env.index.get_file_digest(path).hexdigest()
+
+		self.assertEqual(digest1,digest2)
+		self.assertEqual([path],self.computed)
+
+	def testCopiedDigestCanBeUpdatedWithoutTouchingTheCache(self):
+		''' Test copied file digest can be updated without touching the cache '''
+
+		path = self.fixture_path('default/gallery.js')
+
+		digest = self.env.get_file_digest(path)
+		expected = self.env.digest
+		expected.update(open(path,'rb').read())
+		expected.update('extra')
+
+		updated = digest.copy()
+		updated.update('extra')
+
+		self.assertEqual(expected.hexdigest(),updated.hexdigest())
+		self.assertNotEqual(updated.hexdigest(),digest.hexdigest())
+		self.assertEqual(digest.hexdigest(),self.env.get_file_digest(path).hexdigest())
+
+	def testDigestIsRecomputedWhenFileChanges(self):
+		''' Test file digest is recomputed when the file changes '''
+
+		filename = self.fixture_path('default/tmp-digest.js')
+
+		def do_test():
+			with open(filename,'w') as f:
+				f.write('var a;')
+			digest1 = self.env.get_file_digest(filename).hexdigest()
+
+			with open(filename,'w') as f:
+				f.write('var ab;')
+			digest2 = self.env.get_file_digest(filename).hexdigest()
+
+			self.assertNotEqual(digest1,digest2)
+			self.assertEqual([filename,filename],self.computed)
+
+		self.sandbox(filename,callback=do_test)
+
+	def testDigestsCanBePersistedToCacheStore(self):
+		''' Test file digests can be persisted to the cache store '''
+
+		path = self.fixture_path('default/gallery.js')
+
+		self.env.cache = rivets.caching.MemoryStore()
+		self.env.persist_file_digests = True
+
+		digest = self.env.get_file_digest(path).hexdigest()
+		rivets.file_digests.file_digest_cache.clear()
+
+		self.assertEqual(digest,self.env.get_file_digest(path).hexdigest())
+		self.assertEqual([path],self.computed)
+
+	def testChunkedDigestMatchesWholeFileDigest(self):
+		''' Test chunked and mmap digests match a whole file digest '''
+
+		path = self.fixture_path('default/gallery.js')
+		stats = os.stat(path)
+
+		expected = self.env.digest
+		expected.update(open(path,'rb').read())
+
+		self.env.digest_chunk_size = 3
+		self.assertEqual(expected.hexdigest(),self.env.compute_file_digest(path,stats).hexdigest())
+
+		self.env.digest_mmap_threshold = 1
+		self.assertEqual(expected.hexdigest(),self.env.compute_file_digest(path,stats).hexdigest())
 		
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -148,6 +148,51 @@ class TestDirectiveProcessor(RivetsTest):
 		self.assertEqual("var foo;\n",parser.processed_source)
 		self.assertEqual([(1,"require","foo")],parser.directives)
 
+	def testHeaderScanIsCachedByContent(self):
+		''' Test header scan is cached by content '''
+		parser = self.directive_parser("double_slash")
+
+		self.assertIs(
+				parser.scan(parser.data),
+				self.directive_parser("double_slash").scan(parser.data)
+			)
+		self.assertEqual(self.directives(),parser.directives)
+
+	def testRequireTreeRequiresMatchingFilesInBulk(self):
+		''' Test require_tree requires matching files in bulk '''
+		env = rivets.Environment()
+		env.append_path(self.fixture_path('default'))
+
+		pathname = self.fixture_path('default/mobile/index.js')
+		context = env.context_class(env,'mobile.js',pathname)
+
+		parser = rivets.processing.DirectiveProcessor(pathname)
+		parser.context = context
+		parser.process_require_tree_directive('.')
+
+		self.assertEqual(
+				[self.fixture_path('default/mobile/a.js'),self.fixture_path('default/mobile/b.js')],
+				context.required_paths
+			)
+		self.assertEqual(context.required_paths,context.dependency_assets[1:])
+
+	def testRequireEntriesSkipsMissingFiles(self):
+		''' Test require entries skips files that no longer exist '''
+		env = rivets.Environment()
+		env.append_path(self.fixture_path('default'))
+
+		pathname = self.fixture_path('default/mobile/index.js')
+		context = env.context_class(env,'mobile.js',pathname)
+
+		parser = rivets.processing.DirectiveProcessor(pathname)
+		parser.context = context
+		parser.require_entries([
+				(self.fixture_path('default/mobile/a.js'),False),
+				(self.fixture_path('default/mobile/missing.js'),False)
+			])
+
+		self.assertEqual([self.fixture_path('default/mobile/a.js')],context.required_paths)
+
 	def testDocumentationHeaders(self):
 		''' Test documentation headers '''
 		parser = self.directive_parser("documentation")
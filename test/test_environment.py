@@ -209,6 +209,50 @@ class EnvironmentTests(object):
 				str(self.env['qunit.css'])
 			)
 
+	def testComponentJsonIsParsedOnce(self):
+		''' Test component.json is parsed once '''
+
+		path = self.fixture_path('default/qunit/component.json')
+		component = self.env.read_component(path)
+
+		self.assertEqual('qunit',component['name'])
+		self.assertIs(component,self.env.read_component(path))
+
+	def testComponentJsonIsRegisteredAsDependency(self):
+		''' Test component.json is registered as a dependency '''
+
+		context = self.env.context_class(self.env,'gallery.js',self.fixture_path('default/gallery.js'))
+
+		self.assertEqual(self.fixture_path('default/bower/main.js'),os.path.normpath(context.resolve('bower.js')))
+		self.assertEqual([self.fixture_path('default/bower/component.json')],context.dependency_paths)
+
+	def testResolveWithLogicalPathIndex(self):
+		''' Test resolve with logical path index '''
+
+		def use_index(env):
+			env.use_logical_path_index = True
+			return env
+
+		def resolve(env,path):
+			try:
+				return env.resolve(path)
+			except rivets.errors.FileNotFound:
+				return None
+
+		env = self.new_environment(use_index)
+
+		paths = set(['null','missing.js','mobile','blank','hello'])
+		for logical_path in self.env.each_logical_path():
+			paths.add(logical_path)
+			paths.add(os.path.splitext(logical_path)[0])
+
+		for path in sorted(paths):
+			self.assertEqual(resolve(self.env,path),resolve(env,path),path)
+
+		self.assertEqual([self.fixture_path('default/gallery.js')],env.logical_path_index.find('gallery'))
+		self.assertRaises(rivets.errors.FileNotFound,env.resolve,'null')
+		self.assertRaises(rivets.errors.FileNotFound,env.resolve,'missing.js')
+
 	def testMissingStaticPathReturnsNone(self):
 		''' Test missing static path returns None '''
 
@@ -314,6 +358,32 @@ class EnvironmentTests(object):
 		enum = self.env.each_file()
 		self.assertEqual(self.FILES_IN_PATH,len(enum))
 
+	def testIterFilesIsLazyAndSorted(self):
+		''' Test iter files is lazy and sorted '''
+
+		files = self.env.iter_files()
+		self.assertFalse(isinstance(files,list))
+
+		files = list(files)
+		self.assertEqual(self.FILES_IN_PATH,len(files))
+		self.assertEqual(sorted(files),files)
+
+	def testIterEntriesMatchesDirectoryWalk(self):
+		''' Test iter entries matches a walk of the fixture tree '''
+
+		root = self.fixture_path('default')
+		ignored = re.compile(r"""^\.|~$|^\#.*\#$""")
+
+		expected = []
+		for dirpath,dirnames,filenames in os.walk(root,followlinks=True):
+			dirnames[:] = [name for name in dirnames if not ignored.search(name)]
+			for name in dirnames + filenames:
+				if not ignored.search(name):
+					expected.append(os.path.join(dirpath,name))
+
+		self.assertEqual(self.ENTRIES_IN_PATH,len(expected))
+		self.assertEqual(sorted(expected),list(self.env.iter_entries(root)))
+
 	def testIterateOverEachLogicalPath(self):
 		''' Test iterate over each logical path '''
 
@@ -475,6 +545,23 @@ class TestEnvironment(RivetsTest,EnvironmentTests):
 	def setUp(self):
 		self.env = self.new_environment()
 
+	def testLogicalPathIndexFallsBackForNewFiles(self):
+		''' Test logical path index falls back to the load path for files added after it was built '''
+
+		self.env.use_logical_path_index = True
+		self.env.logical_path_index
+
+		filename = self.fixture_path('default/tmp.js')
+
+		def do_test():
+			with open(filename,'w') as f:
+				f.write('var tmp;')
+
+			self.assertEqual(filename,self.env.resolve('tmp.js'))
+			self.assertEqual('var tmp;\n',str(self.env['tmp.js']))
+
+		self.sandbox(filename,callback=do_test)
+
 	def testChangingPaths(self):
 		''' Test changing paths '''
 
@@ -495,6 +582,33 @@ class TestEnvironment(RivetsTest,EnvironmentTests):
 		self.env.register_bundleprocessor('text/css',WhitespaceCompressor)
 		assert WhitespaceCompressor in self.env.processors.get_bundleprocessors('text/css')
 
+	def testProcessorPipelinesAreCachedUntilRegistryChanges(self):
+		''' Test processor pipelines are cached until registry changes '''
+
+		pipeline = self.env.processors.get_bundle_pipeline('text/css')
+		self.assertIs(pipeline,self.env.processors.get_bundle_pipeline('text/css'))
+		self.assertIs(self.env.get_attributes_for('gallery.css').processors,self.env.get_attributes_for('style.css').processors)
+
+		self.env.register_bundleprocessor('text/css',WhitespaceCompressor)
+		self.assertIsNot(pipeline,self.env.processors.get_bundle_pipeline('text/css'))
+		assert WhitespaceCompressor in self.env.processors.get_bundle_pipeline('text/css')
+
+		self.env.unregister_bundleprocessor('text/css',WhitespaceCompressor)
+		assert WhitespaceCompressor not in self.env.processors.get_bundle_pipeline('text/css')
+
+	def testIndexesReuseEnvironmentPipelines(self):
+		''' Test indexes reuse the environment processor pipelines '''
+
+		pipeline = self.env.processors.get_pipeline('application/javascript')
+		self.assertIs(pipeline,self.env.index.processors.get_pipeline('application/javascript'))
+		self.assertIs(pipeline,self.env.index.processors.get_pipeline('application/javascript'))
+
+		index = self.env.index
+		index.processors.register_preprocessor('application/javascript',WhitespaceCompressor)
+		assert WhitespaceCompressor in index.processors.get_pipeline('application/javascript')
+		assert WhitespaceCompressor not in self.env.processors.get_pipeline('application/javascript')
+		self.assertIs(pipeline,self.env.processors.get_pipeline('application/javascript'))
+
 	def testRegisterCompressor(self):
 		''' Test register compressor '''
 
@@ -788,6 +902,42 @@ class TestEnvironment(RivetsTest,EnvironmentTests):
 				str(self.env["missing_require.js"])
 			)
 
+	def testInvalidateOnlyDropsAffectedAssets(self):
+		''' Test invalidate only drops assets depending on the changed files '''
+
+		self.env['mobile.js']
+		self.env['gallery.js']
+
+		assert self.env.assets.has_key(self.env.cache_key_for('mobile.js',bundle=True))
+		assert self.env.assets.has_key(self.env.cache_key_for('gallery.js',bundle=True))
+
+		self.env.invalidate([self.fixture_path('default/mobile/a.js')])
+
+		assert not self.env.assets.has_key(self.env.cache_key_for('mobile.js',bundle=True))
+		assert self.env.assets.has_key(self.env.cache_key_for('gallery.js',bundle=True))
+
+	def testPollingWatcherReportsNewFiles(self):
+		''' Test polling watcher reports new files and their directory '''
+
+		from rivets.watcher import PollingWatcher
+
+		filename = self.fixture_path('default/tmp-watch.js')
+		changes = []
+
+		watcher = PollingWatcher(self.env.paths,changes.extend)
+		watcher.snapshot = watcher.scan()
+
+		def do_test():
+			with open(filename,'w') as f:
+				f.write('var tmp;')
+
+			watcher.poll()
+
+			assert filename in changes
+			assert self.fixture_path('default') in changes
+
+		self.sandbox(filename,callback=do_test)
+
 class TestIndex(RivetsTest,EnvironmentTests):
 
 	def new_environment(self,callback=None):
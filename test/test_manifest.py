@@ -6,6 +6,9 @@ else:
 	import unittest
 import os
 import tempfile
+import shutil
+import json
+import time
 
 from rivets_test import RivetsTest
 import rivets
@@ -31,4 +34,67 @@ class TestManifest(RivetsTest):
 		manifest = rivets.Manifest(environment=self.env,path=path)
 
 		self.assertEqual(directory,manifest.dir)
-		self.assertEqual(path,manifest.path)
\ No newline at end of file
+		self.assertEqual(path,manifest.path)
+
+	def testParallelCompileMatchesSerialCompile(self):
+		''' Test parallel compile writes the same manifest as a serial compile '''
+
+		serial_dir = tempfile.mkdtemp()
+		parallel_dir = tempfile.mkdtemp()
+
+		try:
+			serial = rivets.Manifest(environment=self.env,path=os.path.join(serial_dir,'manifest.json'))
+			serial.compile('gallery.js','mobile.js','blank.gif')
+
+			parallel = rivets.Manifest(environment=self.env,path=os.path.join(parallel_dir,'manifest.json'))
+			parallel.compile('gallery.js','mobile.js','blank.gif',workers=2)
+
+			self.assertEqual(serial.data,parallel.data)
+			self.assertEqual(
+					json.loads(open(serial.path).read()),
+					json.loads(open(parallel.path).read())
+				)
+
+			for digest_path in parallel.files().iterkeys():
+				assert os.path.exists(os.path.join(parallel_dir,digest_path))
+
+		finally:
+			shutil.rmtree(serial_dir)
+			shutil.rmtree(parallel_dir)
+
+	def testIncrementalCompileOnlyRebuildsChangedAssets(self):
+		''' Test incremental compile only rebuilds assets whose sources changed '''
+
+		directory = tempfile.mkdtemp()
+		filename = self.fixture_path('default/mobile/a.js')
+
+		def do_test():
+			manifest = rivets.Manifest(environment=self.env,path=os.path.join(directory,'manifest.json'))
+			manifest.compile('gallery.js','mobile.js','mobile/a.js')
+
+			manifest = rivets.Manifest(environment=self.env,path=manifest.path)
+			built = []
+			build_asset = manifest.build_asset
+
+			def record_build(path):
+				built.append(path)
+				return build_asset(path)
+
+			manifest.build_asset = record_build
+
+			manifest.compile('gallery.js','mobile.js','mobile/a.js',incremental=True)
+			self.assertEqual([],built)
+
+			with open(filename,'w') as f:
+				f.write('var A2;\n')
+
+			new_time = time.time() + 10
+			os.utime(filename,(new_time,new_time))
+
+			manifest.compile('gallery.js','mobile.js','mobile/a.js',incremental=True)
+			self.assertEqual(['mobile.js','mobile/a.js'],sorted(built))
+
+		try:
+			self.sandbox(filename,callback=do_test)
+		finally:
+			shutil.rmtree(directory)
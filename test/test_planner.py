@@ -0,0 +1,121 @@
+import sys
+sys.path.insert(0,'../')
+if sys.version_info[:2] == (2,6):
+	import unittest2 as unittest
+else:
+	import unittest
+
+from rivets_test import RivetsTest
+import rivets
+
+class TestBuildPlanner(RivetsTest):
+
+	def setUp(self):
+		self.env = rivets.Environment()
+		self.env.append_path(self.fixture_path('default'))
+
+	def testGraphContainsRequiredPaths(self):
+		''' Test graph contains required paths '''
+
+		planner = rivets.BuildPlanner(self.env)
+		planner.plan('mobile.js')
+
+		index = self.fixture_path('default/mobile/index.js')
+
+		self.assertEqual(
+				[self.fixture_path('default/mobile/a.js'),self.fixture_path('default/mobile/b.js')],
+				planner.graph[index]
+			)
+		self.assertEqual(index,planner.order[-1])
+
+	def testSharedDependenciesAreProcessedOnce(self):
+		''' Test shared dependencies are processed once '''
+
+		constructed = []
+		original = rivets.assets.ProcessedAsset.__init__
+
+		def init(asset,environment,logical_path,pathname,init=True):
+			if init:
+				constructed.append(pathname)
+			original(asset,environment,logical_path,pathname,init)
+
+		rivets.assets.ProcessedAsset.__init__ = init
+		try:
+			planner = rivets.BuildPlanner(self.env)
+			assets = planner.build('mobile.js','mobile/a.js')
+		finally:
+			rivets.assets.ProcessedAsset.__init__ = original
+
+		self.assertEqual(
+				[self.fixture_path('default/mobile/a.js'),self.fixture_path('default/mobile/b.js'),self.fixture_path('default/mobile/index.js')],
+				sorted(constructed)
+			)
+		self.assertEqual(3,planner.stats['processed'])
+		self.assertEqual(2,planner.stats['redundant_runs_avoided'])
+
+		self.assertEqual(str(self.env['mobile.js']),str(assets['mobile.js']))
+		self.assertEqual(str(self.env['mobile/a.js']),str(assets['mobile/a.js']))
+
+	def testRepeatedPlansDoNotDuplicateRoots(self):
+		''' Test repeated plans do not duplicate roots '''
+
+		planner = rivets.BuildPlanner(self.env)
+		planner.plan('mobile.js')
+		planner.plan('mobile.js')
+
+		self.assertEqual(1,len(planner.roots))
+		self.assertEqual(3,len(planner.order))
+
+	def testRequireClosureUsesCachedDirectives(self):
+		''' Test require closure uses cached directives '''
+
+		self.env.cache = rivets.caching.MemoryStore()
+		index = self.fixture_path('default/mobile/index.js')
+
+		self.assertEqual(
+				[self.fixture_path('default/mobile/a.js'),self.fixture_path('default/mobile/b.js'),index],
+				self.env.require_closure('mobile.js')
+			)
+
+		key = self.env.expand_directives_key(self.env.get_file_digest(index).hexdigest(),rivets.processing.DirectiveProcessor)
+		self.assertEqual([(1,'require_tree','.')],self.env.cache.get(key))
+		self.assertEqual([(1,'require_tree','.')],self.env.get_directives(index))
+
+	def testRequireClosureExcludesStubbedAssets(self):
+		''' Test require closure excludes stubbed assets '''
+
+		env = rivets.Environment()
+		env.append_path(self.fixture_path('asset'))
+
+		self.assertEqual(
+				[self.fixture_path('asset/stub/jquery-ui.js'),self.fixture_path('asset/stub/skip_jquery.js')],
+				env.require_closure('stub/skip_jquery.js')
+			)
+
+		for path in ['stub/skip_jquery.js','stub/application.js']:
+			self.assertEqual(
+					[asset.pathname for asset in env.find_asset(path).required_assets],
+					env.require_closure(path)
+				)
+
+		planner = rivets.BuildPlanner(env)
+		planner.plan('stub/application.js')
+
+		self.assertEqual([self.fixture_path('asset/stub/frameworks.js')],planner.stubs[self.fixture_path('asset/stub/application.js')])
+		self.assertIn(self.fixture_path('asset/stub/frameworks.js'),planner.order)
+
+	def testCircularRequireRaisesAnError(self):
+		''' Test circular require raises an error '''
+
+		env = rivets.Environment()
+		env.append_path(self.fixture_path('asset'))
+
+		planner = rivets.BuildPlanner(env)
+		self.assertRaises(
+				rivets.errors.CircularDependencyError,
+				planner.plan,
+				'circle/a.js'
+			)
+
+if __name__ == '__main__':
+    unittest.main()
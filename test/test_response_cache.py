@@ -0,0 +1,51 @@
+import sys
+sys.path.insert(0,'../')
+if sys.version_info[:2] == (2,6):
+	import unittest2 as unittest
+else:
+	import unittest
+
+from rivets_test import RivetsTest
+from rivets.response_cache import ResponseCache
+
+class TestResponseCache(RivetsTest):
+
+	def setUp(self):
+		self.cache = ResponseCache(max_bytes=10)
+
+	def testHitRequiresMatchingDigest(self):
+		''' Test hit requires matching digest '''
+
+		self.cache.set('a.js','abc','var a;',{'ETag':'"abc"'})
+
+		self.assertEqual('var a;',self.cache.get('a.js','abc').body)
+		self.assertIsNone(self.cache.get('a.js','def'))
+		self.assertIsNone(self.cache.get('a.js','abc'))
+
+		self.assertEqual(1,self.cache.hits)
+		self.assertEqual(2,self.cache.misses)
+		self.assertEqual(0,self.cache.bytes)
+
+	def testEvictsLeastRecentlyUsedByBytes(self):
+		''' Test evicts least recently used entries by bytes '''
+
+		self.cache.set('a.js','a','aaaa',{})
+		self.cache.set('b.js','b','bbbb',{})
+		self.cache.get('a.js','a')
+		self.cache.set('c.js','c','cccc',{})
+
+		assert self.cache.get('a.js','a')
+		self.assertIsNone(self.cache.get('b.js','b'))
+		assert self.cache.get('c.js','c')
+
+		self.assertEqual(1,self.cache.evictions)
+		self.assertEqual(8,self.cache.bytes)
+
+	def testBodiesLargerThanCacheAreNotStored(self):
+		''' Test bodies larger than the cache are not stored '''
+
+		self.assertIsNone(self.cache.set('big.js','x','x'*11,{}))
+		self.assertEqual(0,len(self.cache))
+
+if __name__ == '__main__':
+    unittest.main()
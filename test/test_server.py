@@ -9,6 +9,7 @@ import cherrypy
 from cherrypy.test import helper
 import os
 import datetime, time
+import zlib
 import regex as re
 
 import rivets
@@ -181,7 +182,7 @@ class TestServer(RivetsTest,helper.CPWebCase):
 		self.assertStatus('200 OK')
 		etag = self.get_header('ETag')
 
-		self.getPage('/assets/application.js?body=1',headers=[('HTTP_IF_NONE_MATCH',etag)])
+		self.getPage('/assets/application.js?body=1',headers=[('If-None-Match',etag)])
 
 		self.assertStatus('304 Not Modified')
 		self.assertHeader('Content-Type',None)
@@ -266,5 +267,142 @@ class TestServer(RivetsTest,helper.CPWebCase):
 		self.assertHeader('Content-Type','text/plain;charset=utf-8')
 		self.assertBody(open(TestServer._fixture_path('server/app/javascripts/hello.txt')).read())
 
+	def testServingStaticAssetsSetsContentLengthFromStat(self):
+		''' Test serving static assets sets content length from stat '''
+
+		size = os.stat(TestServer._fixture_path('server/app/javascripts/hello.txt')).st_size
+
+		self.getPage('/assets/hello.txt')
+		self.assertStatus('200 OK')
+		self.assertHeader('Content-Length',str(size))
+
+	def testServingSingleByteRange(self):
+		''' Test serving a single byte range of a static asset '''
+
+		size = os.stat(TestServer._fixture_path('server/app/javascripts/hello.txt')).st_size
+
+		self.getPage('/assets/hello.txt',headers=[('Range','bytes=2-8')])
+		self.assertStatus('206 Partial Content')
+		self.assertHeader('Accept-Ranges','bytes')
+		self.assertHeader('Content-Range','bytes 2-8/%d'%size)
+		self.assertHeader('Content-Length','7')
+		self.assertBody('=requir')
+
+	def testServingSuffixByteRange(self):
+		''' Test serving a suffix byte range of a static asset '''
+
+		self.getPage('/assets/hello.txt',headers=[('Range','bytes=-6')])
+		self.assertStatus('206 Partial Content')
+		self.assertBody('world\n')
+
+	def testServingMultipleByteRanges(self):
+		''' Test serving multiple byte ranges of a static asset '''
+
+		self.getPage('/assets/hello.txt',headers=[('Range','bytes=0-0,2-2')])
+		self.assertStatus('206 Partial Content')
+		self.assertRegexpMatches(self.get_header('Content-Type'),re.compile(r"""^multipart/byteranges; boundary="""))
+		self.assertHeader('Content-Length',str(len(self.body)))
+		self.assertRegexpMatches(self.body,re.compile(r"""Content-Range: bytes 0-0/\d+\r\n\r\n#\r\n"""))
+		self.assertRegexpMatches(self.body,re.compile(r"""Content-Range: bytes 2-2/\d+\r\n\r\n=\r\n"""))
+
+	def testUnsatisfiableByteRange(self):
+		''' Test unsatisfiable byte range returns 416 '''
+
+		size = os.stat(TestServer._fixture_path('server/app/javascripts/hello.txt')).st_size
+
+		self.getPage('/assets/hello.txt',headers=[('Range','bytes=%d-'%(size+10))])
+		self.assertStatus('416 Requested Range Not Satisfiable')
+		self.assertHeader('Content-Range','bytes */%d'%size)
+
+	def testIfRangeMismatchServesFullBody(self):
+		''' Test mismatched If-Range serves the full body '''
+
+		self.getPage('/assets/hello.txt',headers=[('Range','bytes=0-4'),('If-Range','"stale"')])
+		self.assertStatus('200 OK')
+		self.assertBody(open(TestServer._fixture_path('server/app/javascripts/hello.txt')).read())
+
+	def testServeGzipEncodedBundle(self):
+		''' Test serve gzip encoded bundle when accepted '''
+
+		self.getPage('/assets/application.js',headers=[('Accept-Encoding','gzip, deflate')])
+		self.assertStatus('200 OK')
+		self.assertHeader('Content-Encoding','gzip')
+		self.assertHeader('Vary','Accept-Encoding')
+		self.assertHeader('Content-Length',str(len(self.body)))
+		self.assertEqual(
+				'var foo;\n\n(function() {\n  application.boot();\n})();\n',
+				zlib.decompress(self.body,31)
+			)
+
+	def testServeIdentityWhenGzipIsRefused(self):
+		''' Test serve identity encoding when gzip is refused '''
+
+		self.getPage('/assets/application.js',headers=[('Accept-Encoding','gzip;q=0')])
+		self.assertStatus('200 OK')
+		self.assertNoHeader('Content-Encoding')
+		self.assertBody('var foo;\n\n(function() {\n  application.boot();\n})();\n')
+
+	def testFingerprintedResponsesAreServedFromCache(self):
+		''' Test repeated fingerprinted requests serve the same cached response '''
+
+		self.getPage('/assets/application.js')
+		digest = re.findall(r'''"(.+)"''',self.get_header('ETag'))[0]
+
+		self.getPage('/assets/application-%s.js'%digest)
+		first_body = self.body
+		first_etag = self.get_header('ETag')
+
+		self.getPage('/assets/application-%s.js'%digest)
+		self.assertStatus('200 OK')
+		self.assertEqual(first_body,self.body)
+		self.assertEqual(first_etag,self.get_header('ETag'))
+		self.assertRegexpMatches(self.get_header('Cache-Control'),re.compile(r"""max-age"""))
+
+	def testNotModifiedWhenEtagIsInList(self):
+		''' Test not modified when etag is one of several, including weak etags '''
+
+		self.getPage('/assets/application.js')
+		etag = self.get_header('ETag')
+
+		self.getPage('/assets/application.js',headers=[('If-None-Match','"other", W/%s'%etag)])
+		self.assertStatus('304 Not Modified')
+		self.assertHeader('ETag',etag)
+
+	def testModifiedWhenEtagDoesNotMatch(self):
+		''' Test full response when no etag matches '''
+
+		self.getPage('/assets/application.js',headers=[('If-None-Match','"other"')])
+		self.assertStatus('200 OK')
+
+	def testNotModifiedSinceLastModified(self):
+		''' Test not modified when If-Modified-Since is not older than the asset '''
+
+		self.getPage('/assets/foo.js')
+		last_modified = self.get_header('Last-Modified')
+
+		self.getPage('/assets/foo.js',headers=[('If-Modified-Since',last_modified)])
+		self.assertStatus('304 Not Modified')
+
+		self.getPage('/assets/foo.js',headers=[('If-Modified-Since','Thu, 01 Jan 1970 00:00:00 GMT')])
+		self.assertStatus('200 OK')
+
+	def testNotModifiedForMatchingFingerprint(self):
+		''' Test not modified for fingerprinted path when the fingerprint matches '''
+
+		self.getPage('/assets/application.js')
+		etag = self.get_header('ETag')
+		digest = re.findall(r'''"(.+)"''',etag)[0]
+
+		self.getPage('/assets/application-%s.js'%digest,headers=[('If-None-Match',etag)])
+		self.assertStatus('304 Not Modified')
+		self.assertHeader('ETag',etag)
+
+	def testMissingFingerprintedAssetIsNotFoundEvenIfFingerprintMatches(self):
+		''' Test missing fingerprinted asset is not found even if the fingerprint matches '''
+
+		digest = 'a'*32
+		self.getPage('/assets/missing-%s.js'%digest,headers=[('If-None-Match','"%s"'%digest)])
+		self.assertStatus('404 Not Found')
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file